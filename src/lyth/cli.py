@@ -5,11 +5,14 @@ import sys
 import traceback
 
 from lyth.compiler.analyzer import Analyzer
+from lyth.compiler.cache import TokenCache
 from lyth.compiler.error import LythSyntaxError
+from lyth.compiler.identifier import IdentifierTable
 # from lyth.compiler.interpreter import Interpreter
 from lyth.compiler.lexer import Lexer
 from lyth.compiler.parser import Parser
 from lyth.compiler.scanner import Scanner
+from lyth.compiler.source import sources
 from lyth.usage import fetch
 
 
@@ -20,9 +23,19 @@ def main(argv=sys.argv):
     settings = fetch(argv[1:])
     error = 0
 
+    Lexer.cache = TokenCache(settings.cache_dir, settings.cache_size) if settings.cache != "off" else None
+
+    if settings.cache == "clear":
+        Lexer.cache.clear()
+
     # interpreter = Interpreter()
 
     count = 0
+    scanner = None
+
+    # The inputs of the console make up a single compilation unit, and share
+    # their identifiers.
+    identifiers = IdentifierTable()
 
     while count <= settings.cycle:
         try:
@@ -34,7 +47,7 @@ def main(argv=sys.argv):
                     if not line or len(line) - len(line.lstrip()) == 0:
                         break
 
-            scanner = Scanner(source + "\n")
+            scanner = Scanner(source + "\n", identifiers=identifiers)
             parser = Parser(Lexer(scanner))
             analyzer = Analyzer(parser)
 
@@ -58,6 +71,10 @@ def main(argv=sys.argv):
             error = 1
             break
 
+        # The text of each input is forgotten once it has been processed.
+        if scanner is not None:
+            sources.release(scanner.source_id)
+
         if settings.cycle:
             count += 1
 
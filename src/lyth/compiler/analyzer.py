@@ -5,21 +5,47 @@ The semantic analyzer parses an AST tree and maintains a symbol table.
 """
 from __future__ import annotations
 
+import operator
 from enum import Enum
 from typing import Any
+from typing import Callable
+from typing import Dict
 from typing import Generator
 from typing import NoReturn
 from typing import Optional
 from typing import Union
 
 from lyth.compiler.ast import Node
+from lyth.compiler.ast import NodeType
 from lyth.compiler.error import LythError
 from lyth.compiler.error import LythSyntaxError
+from lyth.compiler.identifier import IdentifierTable
 from lyth.compiler.parser import Parser
 from lyth.compiler.symbol import Field
 from lyth.compiler.symbol import Name
 from lyth.compiler.symbol import SymbolType
 
+# The operations computed from the values of their members, rather than by a
+# method of their own.
+_OPERATIONS: Dict[NodeType, Callable[..., Any]] = {
+    NodeType.BitAnd: operator.and_,
+    NodeType.BitOr: operator.or_,
+    NodeType.Diff: operator.ne,
+    NodeType.Eq: operator.eq,
+    NodeType.Flip: operator.invert,
+    NodeType.Floor: operator.floordiv,
+    NodeType.Gt: operator.gt,
+    NodeType.Gte: operator.ge,
+    NodeType.LShift: operator.lshift,
+    NodeType.Lt: operator.lt,
+    NodeType.Lte: operator.le,
+    NodeType.Mod: operator.mod,
+    NodeType.Neg: operator.neg,
+    NodeType.Not: operator.not_,
+    NodeType.RShift: operator.rshift,
+    NodeType.Xor: operator.xor,
+}
+
 
 class Context(Enum):
     """
@@ -48,11 +74,15 @@ class Analyzer:
         eventually raises StopIteration, as long as it returns AST nodes.
 
         The analyzer bootstraps its symbol table by placing a root node which
-        is the module itself it is exploring.
+        is the module itself it is exploring. The scope is interned, as names
+        are, in the table of identifiers of the source, so that looking a name
+        up in the table compares ids.
         """
         self.parser: Parser = parser
         self.scope: str = scope or parser.lexer.scanner.filename
-        self.table: Name = Name.root(self.scope, "root", SymbolType())
+        self.identifiers: IdentifierTable = parser.lexer.scanner.identifiers if parser is not None else IdentifierTable()
+        self.scope_id: int = self.identifiers.intern(self.scope)
+        self.table: Name = Name.root(self.scope, "root", SymbolType(), self.identifiers)
         self._stream: Generator[Any, None, None] = self._next()
 
     def __call__(self) -> Any:
@@ -110,8 +140,14 @@ class Analyzer:
         It visits the root node provided as input by dispatching the call to
         the right method, depending on the name of the node being analyzed, or
         to an error function raising an Exception if the name cannot be handled
-        by this instance.
+        by this instance. Operators without a method of their own are computed
+        from the values of their members.
         """
+        operation = _OPERATIONS.get(node.name)
+
+        if operation is not None:
+            return operation(*[self.visit(child, Context.LOAD) for child in node])
+
         return getattr(self, "visit_" + node.name.name.lower(), self.error)(node, context)
 
     def visit_add(self, node: Node, context: Context) -> int:
@@ -122,6 +158,14 @@ class Analyzer:
         right = self.visit(node.right, Context.LOAD)
         return left + right
 
+    def visit_and(self, node: Node, context: Context) -> Any:
+        """
+        A logical and, which only evaluates its right member if its left
+        member is true.
+        """
+        left = self.visit(node.left, Context.LOAD)
+        return left and self.visit(node.right, Context.LOAD)
+
     def visit_div(self, node: Node, context: Context) -> float:
         """
         A node asking for an addition requires a result
@@ -138,14 +182,14 @@ class Analyzer:
         already present in the symbol table..
         """
         name = self.visit(node.left, Context.STORE)
-        symbol = self.table.get((name, self.scope), None)
+        symbol = self.table.get(Name(name, self.scope_id, SymbolType(), self.identifiers), None)
 
         if symbol is not None:
             raise LythSyntaxError(node.info, msg=LythError.REASSIGN_IMMUTABLE)
 
         else:
-            self.table += Name(name, self.scope,
-                               SymbolType(Field.UNKNOWN, Field.IMMUTABLE, self.visit(node.right, Context.LOAD)))
+            self.table += Name(name, self.scope_id,
+                               SymbolType(Field.UNKNOWN, Field.IMMUTABLE, self.visit(node.right, Context.LOAD)), self.identifiers)
 
     def visit_let(self, node: Node, context: Context) -> Node:
         """
@@ -168,14 +212,14 @@ class Analyzer:
         An assign operator to a mutable variable requests immediate assistance.
         """
         name = self.visit(node.left, Context.STORE)
-        symbol = self.table.get((name, self.scope), None)
+        symbol = self.table.get(Name(name, self.scope_id, SymbolType(), self.identifiers), None)
 
         if symbol is not None:
             symbol.type.value = self.visit(node.right, Context.LOAD)
 
         else:
-            self.table += Name(name, self.scope,
-                               SymbolType(Field.UNKNOWN, Field.MUTABLE, self.visit(node.right, Context.LOAD)))
+            self.table += Name(name, self.scope_id,
+                               SymbolType(Field.UNKNOWN, Field.MUTABLE, self.visit(node.right, Context.LOAD)), self.identifiers)
 
     def visit_name(self, node: Node, context: Context) -> Union[str, int, Field]:
         """
@@ -183,17 +227,19 @@ class Analyzer:
 
         If the context is to store the result of an expression into a variable,
         usually writing a symbol to the symbol table, then this method returns
-        a name.
+        the id of a name, interning it if the parser did not.
 
         If the context is to load the value referenced by this name, usually
         reading a symbol from the symbol table, then this method returns the
         value in the symbol table (or return an error if the variable is
         referenced before it was assigned any value in the symbol table.)
         """
+        name = node.name_id if node.name_id >= 0 else self.identifiers.intern(node.value)
+
         if context is Context.STORE:
-            return node.value
+            return name
 
-        symbol = self.table.get((node.value, self.scope), None)
+        symbol = self.table.get(Name(name, self.scope_id, SymbolType(), self.identifiers), None)
         if symbol is None:
             raise LythSyntaxError(node.info, msg=LythError.VARIABLE_REFERENCED_BEFORE_ASSIGNMENT)
 
@@ -211,6 +257,14 @@ class Analyzer:
         """
         return node.value
 
+    def visit_or(self, node: Node, context: Context) -> Any:
+        """
+        A logical or, which only evaluates its right member if its left member
+        is false.
+        """
+        left = self.visit(node.left, Context.LOAD)
+        return left or self.visit(node.right, Context.LOAD)
+
     def visit_sub(self, node: Node, context: Context) -> int:
         """
         A node asking for an addition requires a result
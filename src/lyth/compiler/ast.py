@@ -21,18 +21,42 @@ class NodeType(Enum):
     visit.
     """
     Add = Symbol.ADD
+    And = Keyword.AND
+    At = Keyword.AT
+    Attribute = Symbol.DOT
+    BitAnd = Symbol.AND
+    BitOr = Symbol.OR
     Class = "class"  # Special Node for which there is no keyword.
+    Diff = Symbol.DIFF
     Doc = Symbol.DOC
     Div = Symbol.DIV
+    Eq = Symbol.EQ
+    Flip = Symbol.FLIP
+    Floor = Symbol.FLOOR
+    Gt = Symbol.GT
+    Gte = Symbol.GTE
     ImmutableAssign = Symbol.RASSIGN
+    In = Keyword.IN
+    Is = Keyword.IS
     Let = Keyword.LET
+    LShift = Symbol.LSHIFT
+    Lt = Symbol.LT
+    Lte = Symbol.LTE
+    Mod = Symbol.MOD
     Mul = Symbol.MUL
     MutableAssign = Symbol.LASSIGN
     Name = Literal.STRING
+    Neg = "neg"  # Special Node for which there is no symbol, '-' being a substraction.
     Noop = None
+    Not = Keyword.NOT
     Num = Literal.VALUE
+    Of = Keyword.OF
+    Or = Keyword.OR
+    Range = Symbol.RANGE
+    RShift = Symbol.RSHIFT
     Sub = Symbol.SUB
     Type = "type"
+    Xor = Symbol.XOR
 
     @classmethod
     def as_value(cls, symbol: Optional[str]) -> NodeType:
@@ -57,8 +81,11 @@ class Node:
     usually, it has a left and a right member.
 
     Last but not least, the AST node stores metadata coming from the token,
-    such as the filename, the line number and the column in corresponding
-    source code.
+    such as the identifier of the source, the line number and the column in
+    corresponding source code. The position is read from the token
+    information, and the filename and the line are resolved from the source,
+    when they are read. A name also stores the id of its
+    identifier, which the symbol table compares rather than strings.
     """
     def __init__(self, token: Token, *nodes: Optional[Node]) -> Node:
         """
@@ -70,11 +97,10 @@ class Node:
         """
         self.name = NodeType.as_value(token.symbol)
         self._children = nodes if nodes else (token.lexeme, )
+        self.name_id = token.name_id if self.name is NodeType.Name else -1
 
-        self.filename = token.info.filename
-        self.lineno = token.info.lineno
-        self.offset = token.info.offset
-        self.line = token.info.line
+        self.source_id = token.info.source_id
+        self._info = token.info
 
     def __iter__(self):
         """
@@ -102,10 +128,20 @@ class Node:
         As Lyth does not have the "class" keyword, the class is defined when
         the following pattern is detected: 'let $NAME:'.
         """
-        info = SimpleNamespace(filename=name.filename, lineno=name.lineno, offset=name.offset, line=name.line)
-        ns = SimpleNamespace(symbol="class", lexeme='', info=info)
+        ns = SimpleNamespace(symbol="class", lexeme='', info=name.info)
         return cls(ns, name, base, *nodes)
 
+    @classmethod
+    def neg(cls, token: Token, node: Node) -> Node:
+        """
+        A negation.
+
+        The '-' symbol is a substraction between two members, and a negation
+        when it leads a member, in which case it is given this node instead.
+        """
+        ns = SimpleNamespace(symbol="neg", lexeme='', info=token.info)
+        return cls(ns, node)
+
     @classmethod
     def noop(cls) -> Node:
         """
@@ -114,8 +150,7 @@ class Node:
         When the parser deciphers an empty line, rather than returning None, it
         returns this AST node instead.
         """
-        info = SimpleNamespace(filename='noop', lineno=-1, offset=-1, line='')
-        ns = SimpleNamespace(symbol=None, lexeme='', info=info)
+        ns = SimpleNamespace(symbol=None, lexeme='', info=TokenInfo('noop', -1, -1, ''))
         return cls(ns)
 
     @classmethod
@@ -126,8 +161,7 @@ class Node:
         The 'be' keyword makes the next node a name pointing to a class this
         class definition inherits from.
         """
-        info = SimpleNamespace(filename=name.filename, lineno=name.lineno, offset=name.offset, line=name.line)
-        ns = SimpleNamespace(symbol="type", lexeme='', info=info)
+        ns = SimpleNamespace(symbol="type", lexeme='', info=name.info)
         return cls(ns, name)
 
     def __repr__(self) -> str:
@@ -142,12 +176,40 @@ class Node:
         """
         return f"{self.name.name}({', '.join([str(c) for c in self._children])})"
 
+    @property
+    def filename(self) -> str:
+        """
+        Returns the filename of the source this node was parsed from.
+        """
+        return self._info.filename
+
     @property
     def info(self) -> TokenInfo:
         """
         Returns the original token information.
         """
-        return TokenInfo(self.filename, self.lineno, self.offset, self.line)
+        return self._info
+
+    @property
+    def line(self) -> str:
+        """
+        Returns the line of source code this node was parsed from.
+        """
+        return self._info.line
+
+    @property
+    def lineno(self) -> int:
+        """
+        Returns the line number this node was parsed from.
+        """
+        return self._info.lineno
+
+    @property
+    def offset(self) -> int:
+        """
+        Returns the column this node was parsed from.
+        """
+        return self._info.offset
 
     @property
     def left(self) -> Union[Node, Union[int, str]]:
@@ -0,0 +1,297 @@
+"""
+This module contains the token buffer.
+
+The TokenBuffer holds the tokens of a whole source as a structure of arrays
+rather than as a list of tokens: one array per field, and a table of the
+lexemes, each distinct lexeme being stored once. A token costs a couple dozen
+bytes rather than a couple of objects, and can be walked through by its kind
+without allocating anything. Tokens are only materialised when they are
+needed, for instance to report an error.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from array import array
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Union
+
+from lyth.compiler.source import sources
+from lyth.compiler.token import KINDS
+from lyth.compiler.token import Keyword
+from lyth.compiler.token import Literal
+from lyth.compiler.token import Sentinel
+from lyth.compiler.token import Symbol
+from lyth.compiler.token import Token
+from lyth.compiler.token import TokenInfo
+
+if TYPE_CHECKING:
+    from lyth.compiler.scanner import Scanner
+
+LITERAL = 0x8000  # The flag of a token scanned within a docstring.
+
+# The format of the binary form of buffers, which holds the codes of kinds: a
+# checksum of the kinds in their order, so that it changes along with them.
+FORMAT = zlib.crc32(' '.join(f"{kind.__class__.__name__}.{kind.name}" for kind in KINDS).encode())
+
+_ARRAYS = ('kinds', 'starts', 'lengths', 'linenos', 'offsets', 'lexemes')
+_HEADER = struct.Struct('=IIIII')  # The magic number, the format, and the numbers of tokens, of lexemes, and of bytes of text.
+_MAGIC = 0x4C595442  # Read back as another number on a machine of another byte order.
+_NONE, _INT, _STR = range(3)  # The types of the lexemes, as serialised.
+
+
+class TokenBuffer:
+    """
+    The tokens of a source, held as arrays.
+
+    The arrays are:
+    - kinds: the code of the symbol of each token, an index in KINDS, flagged
+      with LITERAL if the token was scanned within a docstring.
+    - starts: the absolute index of each token in its source, as reported by
+      its token information.
+    - lengths: the length of each lexeme, values being counted by their digits
+      and indents by their spaces.
+    - linenos and offsets: the line and column of each token, as the lexer
+      reported them.
+    - lexemes: the index of each lexeme in the table of lexemes.
+    """
+    def __init__(self, source_id: int, table: List[Union[str, int, None]] = None) -> None:
+        """
+        Instantiate an empty buffer for a source.
+
+        The table of lexemes can be shared with another buffer, slices of a
+        buffer sharing the table of the buffer they are taken from.
+
+        The buffer holds the scanner of its source, if it is alive, so that its
+        tokens can still read their lines once the lexer is gone.
+        """
+        self.source_id: int = source_id
+        self.kinds: array = array('H')
+        self.starts: array = array('I')
+        self.lengths: array = array('I')
+        self.linenos: array = array('I')
+        self.offsets: array = array('i')
+        self.lexemes: array = array('I')
+        self.table: List[Union[str, int, None]] = table if table is not None else []
+        self._ids: Dict[tuple, int] = {}
+        self._scanner: Optional[Scanner] = sources.scanner(source_id)
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[Token], source_id: int) -> TokenBuffer:
+        """
+        Fill a buffer from tokens, which are not kept.
+        """
+        buffer = cls(source_id)
+        append = buffer.append
+
+        for token in tokens:
+            append(token)
+
+        return buffer
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview], source_id: int) -> TokenBuffer:
+        """
+        Rebuild a buffer from the bytes to_bytes() returned, for a source.
+
+        Raises:
+            ValueError: The bytes do not hold a buffer, were written on a
+                        machine of another byte order, or in another format.
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("The data is too short to hold a token buffer")
+
+        magic, version, count, entries, size = _HEADER.unpack_from(data)
+
+        if magic != _MAGIC:
+            raise ValueError("The data does not hold a token buffer")
+
+        if version != FORMAT:
+            raise ValueError("The data holds a token buffer of another format")
+
+        buffer = cls(source_id)
+        view = memoryview(data)[_HEADER.size:]
+        tags = array('B')
+        sizes = array('I')
+
+        for values, length in [(getattr(buffer, name), count) for name in _ARRAYS] + [(tags, entries), (sizes, entries)]:
+            end = values.itemsize * length
+            values.frombytes(view[:end])
+            view = view[end:]
+
+        if len(buffer.lexemes) != count or len(sizes) != entries or len(view) != size:
+            raise ValueError("The data holds a truncated token buffer")
+
+        text = str(view, 'utf-8', 'surrogatepass')
+        position = 0
+
+        for tag, length in zip(tags, sizes):
+            piece = text[position:position + length]
+            position += length
+            buffer.table.append(None if tag == _NONE else int(piece) if tag == _INT else piece)
+
+        if count and max(buffer.lexemes) >= entries:
+            raise ValueError("The data holds a corrupted token buffer")
+
+        buffer._ids = {(lexeme.__class__, lexeme): lexeme_id for lexeme_id, lexeme in enumerate(buffer.table)}
+        return buffer
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Token, TokenBuffer]:
+        """
+        Materialise the token at an index, or take a slice of the buffer.
+
+        A token is built anew each time it is accessed. A slice copies the
+        arrays, but shares the table of lexemes.
+        """
+        if isinstance(index, slice):
+            buffer = self.__class__(self.source_id, self.table)
+            buffer._ids = self._ids
+
+            for name in _ARRAYS:
+                setattr(buffer, name, getattr(self, name)[index])
+
+            return buffer
+
+        kind = self.kinds[index]
+        symbol = KINDS[kind & ~LITERAL]
+        info = TokenInfo(self.source_id, self.linenos[index], self.offsets[index], index=self.starts[index])
+        quotes = self.lengths[index] if symbol is Symbol.QUOTE else 0
+        token = Token.make(symbol, self.table[self.lexemes[index]], info, bool(kind & LITERAL), quotes)
+
+        if symbol is Literal.STRING and not kind & LITERAL and self._scanner is not None:
+            token.name_id = self._scanner.identifiers.intern(token.lexeme)
+
+        return token
+
+    def __getstate__(self) -> dict:
+        """
+        Pickle the buffer without the scanner of its source, which is only
+        known to this process.
+        """
+        state = self.__dict__.copy()
+        state['_scanner'] = None
+        return state
+
+    def __iter__(self) -> Iterator[Token]:
+        """
+        Materialise the tokens one after the other.
+        """
+        for index in range(len(self.kinds)):
+            yield self[index]
+
+    def __len__(self) -> int:
+        """
+        The number of tokens in the buffer.
+        """
+        return len(self.kinds)
+
+    def append(self, token: Token) -> None:
+        """
+        Append a token to the buffer.
+
+        The lexeme is looked up in the table, and only added to it the first
+        time it is met. Values and strings are told apart, so that the value 1
+        and the string '1' are not mixed up.
+        """
+        lexeme = token.lexeme
+        lexeme_id = self._intern(lexeme)
+
+        if lexeme is None:
+            length = 0
+
+        elif token.symbol is Symbol.QUOTE:
+            length = token.quotes
+
+        elif token.symbol is Symbol.INDENT and not isinstance(lexeme, str):
+            length = lexeme * 2
+
+        else:
+            length = len(lexeme) if isinstance(lexeme, str) else len(str(lexeme))
+
+        info = token.info
+        self.kinds.append(token.symbol.code | (LITERAL if token.literal else 0))
+        self.starts.append(max(info.index, 0))
+        self.lengths.append(length)
+        self.linenos.append(info.lineno)
+        self.offsets.append(info.offset)
+        self.lexemes.append(lexeme_id)
+
+    def extend(self, other: TokenBuffer, index: int = 0) -> None:
+        """
+        Append the tokens of another buffer.
+
+        The starts of the tokens are shifted by index characters, so that the
+        buffer of a chunk of a source can be appended to the buffer of the
+        whole source. Their lexemes are looked up in the table as they are
+        met, as if the tokens had been appended one by one.
+        """
+        ids: Dict[int, int] = {}
+        lexemes = array('I')
+
+        for other_id in other.lexemes:
+            lexeme_id = ids.get(other_id)
+
+            if lexeme_id is None:
+                lexeme_id = ids[other_id] = self._intern(other.table[other_id])
+
+            lexemes.append(lexeme_id)
+
+        self.kinds.extend(other.kinds)
+        self.starts.extend(array('I', [start + index for start in other.starts]) if index else other.starts)
+        self.lengths.extend(other.lengths)
+        self.linenos.extend(other.linenos)
+        self.offsets.extend(other.offsets)
+        self.lexemes.extend(lexemes)
+
+    def kind(self, index: int) -> Union[Symbol, Keyword, Literal, Sentinel]:
+        """
+        The symbol of the token at an index, without materialising the token.
+        """
+        return KINDS[self.kinds[index] & ~LITERAL]
+
+    def lexeme(self, index: int) -> Union[str, int, None]:
+        """
+        The lexeme of the token at an index, without materialising the token.
+        """
+        return self.table[self.lexemes[index]]
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialise the buffer into a compact binary form.
+
+        The arrays are written as they are held in memory, after a header
+        giving the format, and their length. The table of lexemes follows, as the type and the
+        length of each lexeme, values being written by their digits, and the
+        text of all the lexemes, UTF-8 encoded. The source is not part of it.
+        """
+        tags = array('B')
+        sizes = array('I')
+        pieces = []
+
+        for lexeme in self.table:
+            piece = '' if lexeme is None else lexeme if isinstance(lexeme, str) else str(lexeme)
+            tags.append(_NONE if lexeme is None else _STR if isinstance(lexeme, str) else _INT)
+            sizes.append(len(piece))
+            pieces.append(piece)
+
+        text = ''.join(pieces).encode('utf-8', 'surrogatepass')
+        header = _HEADER.pack(_MAGIC, FORMAT, len(self.kinds), len(self.table), len(text))
+        return b''.join([header] + [getattr(self, name).tobytes() for name in _ARRAYS] + [tags.tobytes(), sizes.tobytes(), text])
+
+    def _intern(self, lexeme: Union[str, int, None]) -> int:
+        """
+        The index of a lexeme in the table, adding it the first time it is met.
+        """
+        key = (lexeme.__class__, lexeme)
+        lexeme_id = self._ids.get(key)
+
+        if lexeme_id is None:
+            lexeme_id = self._ids[key] = len(self.table)
+            self.table.append(lexeme)
+
+        return lexeme_id
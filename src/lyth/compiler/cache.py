@@ -0,0 +1,189 @@
+"""
+This module contains the token cache.
+
+Lexing a source that has not changed since it was last compiled gives the same
+tokens again. The TokenCache keeps the token buffer of each source in a
+directory, in its binary form, under a key made of the hash of the content of
+the source, of the version of the compiler, and of the format of buffers. A lexer over a source already
+in the cache replays its tokens rather than lexing it again.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from lyth import __version__
+from lyth.compiler.buffer import FORMAT
+from lyth.compiler.buffer import TokenBuffer
+from lyth.compiler.scanner import Scanner
+
+_SUFFIX = ".tok"
+
+
+class TokenCache:
+    """
+    A directory of token buffers, keyed by the content of their source.
+
+    The cache is bounded by the size of its files: once a buffer is stored,
+    the least recently used ones are evicted until the cache fits in max_size
+    bytes. A buffer is used when it is stored or loaded, which is recorded as
+    the modification time of its file.
+
+    The cache is only an optimisation, so that failing to read or write it is
+    not an error: an entry that cannot be read is a miss, and an entry that
+    cannot be written is not stored.
+    """
+    def __init__(self, directory: Union[str, os.PathLike], max_size: int = 64 << 20) -> None:
+        """
+        Instantiate a cache over a directory, which is created if needed.
+        """
+        self.directory: str = os.fspath(directory)
+        self.max_size: int = max_size
+
+    def __len__(self) -> int:
+        """
+        The number of buffers in the cache.
+        """
+        return len(self._entries())
+
+    def clear(self) -> None:
+        """
+        Remove every buffer from the cache.
+        """
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+    def key(self, scanner: Scanner) -> Optional[str]:
+        """
+        The key of the source of a scanner, if it can be cached.
+
+        The key hashes the version of the compiler, the format of buffers, as
+        the codes of the kinds may change within a version, the number of the
+        first line, as it is part of the tokens, and the text of the source as
+        the scanner holds it, a string being told apart from bytes as their
+        tokens may differ in their positions. Tabulations being expanded in
+        that text, where they were is hashed as well, as they are part of the
+        columns of the tokens.
+
+        Only a scanner holding its whole source, and which has not started
+        scanning it, can be cached: a scanner over a stream, or one which has
+        been moved, would not give the tokens of the whole source.
+        """
+        if not scanner.is_whole_source() or (scanner.index, scanner.column, scanner.doc) != (0, -1, False):
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(f"lyth {__version__} {FORMAT} {scanner.lineno} {'str' if isinstance(scanner.data, str) else 'bytes'}\n".encode())
+
+        for chunk in scanner.chunks():
+            digest.update(chunk.encode('utf-8', 'surrogatepass') if isinstance(chunk, str) else chunk)
+
+        digest.update(repr(scanner.tab_positions()).encode())
+
+        return digest.hexdigest()
+
+    def load(self, key: str, source_id: int) -> Optional[TokenBuffer]:
+        """
+        The buffer stored under a key, for a source, if any.
+
+        An entry that cannot be read back is removed.
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, 'rb') as f:
+                buffer = TokenBuffer.from_bytes(f.read(), source_id)
+
+            os.utime(path)
+
+        except ValueError:
+            self._remove(path)
+            return None
+
+        except OSError:
+            return None
+
+        return buffer
+
+    def store(self, key: str, buffer: TokenBuffer) -> None:
+        """
+        Store a buffer under a key, and evict the least recently used buffers
+        if the cache has grown over its size.
+
+        The buffer is written to a temporary file first, and moved in place,
+        so that a process reading the cache meanwhile never sees half of it.
+        """
+        data = buffer.to_bytes()
+
+        if len(data) > self.max_size:
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+
+            os.replace(temp, self._path(key))
+
+        except OSError:
+            return
+
+        self._evict()
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        """
+        The path, the time of last use and the size of each buffer in the
+        cache.
+        """
+        entries = []
+
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(_SUFFIX):
+                        stat = entry.stat()
+                        entries.append((entry.path, stat.st_mtime, stat.st_size))
+
+        except OSError:
+            pass
+
+        return entries
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used buffers until the cache fits in its
+        size.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+
+        for path, _, length in entries:
+            if size <= self.max_size:
+                break
+
+            self._remove(path)
+            size -= length
+
+    def _path(self, key: str) -> str:
+        """
+        The path of the file of a key.
+        """
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """
+        Remove a file, which may have been removed already by another process.
+        """
+        try:
+            os.remove(path)
+
+        except OSError:
+            pass
@@ -6,6 +6,9 @@ from __future__ import annotations
 
 from enum import Enum
 from typing import TYPE_CHECKING
+from typing import Optional
+
+from lyth.compiler.source import sources
 
 if TYPE_CHECKING:
     from lyth.compiler.token import TokenInfo
@@ -41,11 +44,55 @@ class LythSyntaxError(Exception):
     execution itself.
     """
     def __init__(self, info: TokenInfo, msg: LythError = LythError.SYNTAX_ERROR) -> None:
-        super().__init__(f"{msg.value} at '{info.filename}', line {info.lineno}:\n\t"
-                         f"{info.line}\n\t{' ' * info.offset}^")
+        super().__init__(msg)
 
-        self.filename = info.filename
+        self.source_id = info.source_id
         self.lineno = info.lineno
         self.offset = info.offset
-        self.line = info.line
         self.msg = msg
+        self._info = info
+        self._filename: Optional[str] = None  # Only set on errors unpickled, whose source may be unknown.
+        self._scanner = sources.scanner(info.source_id)  # Keeps the line at hand, should the source be dropped.
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickle the error from its token information, which only holds the
+        position of the error in its source.
+
+        The filename and the line are resolved in this process, where the
+        source is known, and carried in the state of the error, so that it is
+        still reported in full once unpickled in another process.
+        """
+        self._info.line  # Cached by the token information, which carries it.
+        return self.__class__, (self._info, self.msg), {'_filename': self.filename}
+
+    @property
+    def filename(self) -> str:
+        """
+        The filename of the source where the error was detected.
+        """
+        return self._filename if self._filename is not None else self._info.filename
+
+    @property
+    def info(self) -> TokenInfo:
+        """
+        The information of the token where the error was detected.
+        """
+        return self._info
+
+    @property
+    def line(self) -> str:
+        """
+        The line of source code where the error was detected.
+
+        The line is only retrieved when it is needed, that is when the error
+        is displayed or inspected, not when it is raised.
+        """
+        return self._info.line
+
+    def __str__(self) -> str:
+        """
+        The error message, pointing at the faulty character in its line.
+        """
+        return (f"{self.msg.value} at '{self.filename}', line {self.lineno}:\n\t"
+                f"{self.line}\n\t{' ' * self.offset}^")
@@ -0,0 +1,80 @@
+"""
+This module contains the table of identifiers.
+
+Identifiers are compared all the way down, from the lexer to the symbol table,
+where looking a name up compares it with a name and a scope at each step of
+the binary tree. Rather than strings, each identifier, and each scope, is given
+an integer id the first time it is met, so that comparing two names is
+comparing two integers, and an identifier met many times is stored once.
+
+There is one table per compilation unit, held by the scanner of its source.
+"""
+from __future__ import annotations
+
+from typing import Dict
+from typing import List
+from typing import Optional
+
+
+class IdentifierTable:
+    """
+    The table of identifiers, mapping an identifier to an integer id.
+
+    Ids are given in sequence, starting from 0, in the order identifiers are
+    met, and are only meaningful within the table that gave them. A table is
+    released along with the scanner holding it, unless the scanners of several
+    sources share one, such as the inputs of a console.
+    """
+    def __init__(self) -> None:
+        """
+        Instantiate an empty table.
+        """
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def __contains__(self, name: str) -> bool:
+        """
+        Tell whether an identifier has been given an id.
+        """
+        return name in self._ids
+
+    def __getitem__(self, name_id: int) -> str:
+        """
+        The identifier of an id, the same string for every occurrence.
+        """
+        return self._names[name_id]
+
+    def __len__(self) -> int:
+        """
+        The number of identifiers met so far.
+        """
+        return len(self._names)
+
+    def clear(self) -> None:
+        """
+        Forget every identifier.
+
+        The ids held by tokens, nodes and names are meaningless from then on,
+        so this is only meant to start over with an empty symbol table.
+        """
+        self._names.clear()
+        self._ids.clear()
+
+    def get(self, name: str) -> Optional[int]:
+        """
+        The id of an identifier, or None if it has not been met, in which case
+        it is not given one.
+        """
+        return self._ids.get(name)
+
+    def intern(self, name: str) -> int:
+        """
+        The id of an identifier, given the first time it is met.
+        """
+        name_id = self._ids.get(name)
+
+        if name_id is None:
+            name_id = self._ids[name] = len(self._names)
+            self._names.append(name)
+
+        return name_id
@@ -5,33 +5,130 @@ The Lexer is the second stage of the lexical analysis. It uses its first stage,
 the Scanner, to get its characters one by one. The scanner keeps track of line
 and column numbering. The Lexer produces Tokens from the characters returned by
 the Scanner.
+
+The RegexLexer is an alternative engine producing the same tokens. It matches
+whole lines against a single regular expression compiled from the symbols,
+and recognizes tokens from a table rather than character by character.
+
+The NumpyLexer is the RegexLexer splitting large blocks of lines at once with
+NumPy, if it is installed, rather than matching lines one by one.
 """
 from __future__ import annotations
 
+import inspect
+import os
+import re
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
 from typing import Generator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
 
+from lyth.compiler.buffer import TokenBuffer
+from lyth.compiler.cache import TokenCache
 from lyth.compiler.error import LythError
 from lyth.compiler.error import LythSyntaxError
+from lyth.compiler.scanner import _SPANS
 from lyth.compiler.scanner import Scanner
+from lyth.compiler.source import sources
 from lyth.compiler.token import Literal
+from lyth.compiler.token import Sentinel
 from lyth.compiler.token import Symbol
 from lyth.compiler.token import Token
+from lyth.compiler.token import TokenInfo
+from lyth.compiler.token import TokenOffset
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+_UNITS = re.compile("|".join([re.escape(symbol.value) for symbol in Symbol if symbol.value and len(symbol.value) == 2]
+                             + [r"[^\W\d]+", r"\d+", r" +", r"\n", r"."]))
+_LOOKAHEAD = 4  # The number of tokens a lexer can look ahead of the token it consumes next.
+_OTHER, _LETTER, _DIGIT, _SPACE, _EOL = range(5)  # The classes of characters the NumpyLexer splits lines by.
+
+
+def _tokenize_chunk(lexer: type, text: str, lineno: int, doc: bool, last: bool) -> Tuple[TokenBuffer, Optional[LythSyntaxError]]:
+    """
+    Lex a chunk of a source, in a worker process.
+
+    The chunk is scanned on its own, numbered from the line it begins at, and
+    with the docstring state of that line. The end of file is only kept for
+    the last chunk. The error raised while lexing the chunk, if any, is
+    returned with the tokens lexed before it.
+    """
+    scanner = Scanner(text, lineno=lineno)
+    scanner.doc = doc
+    buffer = TokenBuffer(scanner.source_id)
+
+    try:
+        for token in lexer(scanner).next():
+            if token.symbol is Symbol.EOF and not last:
+                break
+
+            buffer.append(token)
+
+    except LythSyntaxError as error:
+        return buffer, error
+
+    finally:
+        sources.release(scanner.source_id)
+
+    return buffer, None
 
 
 class Lexer:
     """
     The lexical analyzer for a given source code.
+
+    The lexer reads the source by spans of characters of a same class rather
+    than character by character, but builds the same tokens.
+
+    Tokens can be looked ahead before being consumed. They are kept in a small
+    ring buffer from the time they are lexed to the time they are consumed, so
+    that a token is lexed once, and never pushed back.
+
+    If a token cache is set, the tokens of a source already in the cache are
+    replayed from it rather than lexed, and the tokens of a source lexed in
+    full are stored in it.
+
+    In recovery mode, the lexer does not stop at the first error. The error is
+    recorded in its diagnostics, and the text it is raised on is handed out as
+    an error token, so that all the lexical errors of a source are reported in
+    a single pass.
+
+    In positions mode, the tokens of a source held as a string only record
+    their absolute index in the source. Their line number and column are found
+    in the source when they are read, that is in practice when an error is
+    reported. Ends of line, indents and the end of file are still positioned
+    as usual, as there are few of them.
     """
-    def __init__(self, scanner: Scanner) -> None:
+    cache: Optional[TokenCache] = None  # The token cache of the process, if any.
+
+    def __init__(self, scanner: Scanner, recover: bool = False, positions: bool = False) -> None:
         """
         Instantiate the lexer.
 
         The lexer requires an instance of a scanner on a source of characters.
         It can be anything that is an iterable, a generator that eventually
         raises StopIteration.
+
+        If recover is set, errors are recorded in the diagnostics rather than
+        raised. If positions is set, tokens only record their offset, unless
+        the source is a buffer of bytes.
         """
         self.scanner: Scanner = scanner
-        self._stream: Generator[Token, None, None] = self.next()
+        self.recover: bool = recover
+        self.positions: bool = positions and isinstance(scanner.data, str)
+        self.diagnostics: List[LythSyntaxError] = []
+        self._stream: Generator[Token, None, None] = self._tokens()
+        self._ahead: List[Optional[Token]] = [None] * _LOOKAHEAD
+        self._head: int = 0
+        self._count: int = 0
 
     def __call__(self) -> Token:
         """
@@ -45,7 +142,7 @@ class Lexer:
         raised. Eventually, the end of file is processed as a space, and an EOF
         token is appended.
         """
-        return next(self._stream)
+        return self.advance()
 
     def __iter__(self) -> Lexer:
         """
@@ -62,6 +159,22 @@ class Lexer:
         is callable because it has practically only one meaning in life which
         is fetching the next token...
         """
+        return self.advance()
+
+    def advance(self) -> Token:
+        """
+        Consume the next token.
+
+        The token is taken from the ring buffer if it was looked ahead, and
+        lexed otherwise.
+        """
+        if self._count:
+            token = self._ahead[self._head]
+            self._ahead[self._head] = None
+            self._head = (self._head + 1) % _LOOKAHEAD
+            self._count -= 1
+            return token
+
         return next(self._stream)
 
     def next(self) -> Token:
@@ -72,6 +185,10 @@ class Lexer:
         escape characters (feed line etc.) as well. It yields tokens upon space
         and successive spaces are ignored.
 
+        The scanner hands out spans, that is runs of letters, digits or spaces,
+        and other characters one by one. A span is processed the way its
+        characters would be, one after the other.
+
         There are multiple case to consider here.
         1. A space is detected and a token is being built. The generator yields
            the token, effectively stopping its construction.
@@ -89,10 +206,15 @@ class Lexer:
            one.
         8. If a colon is following directly another token, we stop building the
            token, return it, and generate a colon token.
-        9. If it is not a space and a token is present, then we continue the
-           construction of the current token.
-        10. One quote leads to a quote token, two quotes lead to two quote
-            tokens, three quotes lead to a doc token.
+        9. If the span starts a new token although no space separates it from
+           the current one, as in '-5', '(a', 'a)' or 'f(', the generator
+           yields the current token and starts a new one.
+        10. If it is not a space and a token is present, then we continue the
+            construction of the current token with the span.
+        11. One quote leads to a quote token, two quotes lead to two quote
+            tokens, three quotes lead to a doc token. The docstring is not
+            lexed: its closing quotes are looked for at once, and the doc
+            token holds its whole text.
 
         When the end of file is reached:
         1. If the scanner reached the end of its source, and the last token is
@@ -103,40 +225,46 @@ class Lexer:
         3. The generator then adds an EOF token and leaves the while loop,
            causing the generator to raise StopIteration on future next() calls.
 
-        Exceptions can be ignored:
-        1. The scanner pedanticly requires that symbols are separated with
-           spaces. However '+5', '-5' and '5!' are examples of valid
-           expressions. The generator yields current token and starts a new
-           one.
+        Token boundaries are decided without exceptions: an error raised while
+        building a token is a real error, and is propagated, unless the lexer
+        recovers from it. In that case, the token being built is dropped, and
+        the generator yields an error token instead, up to the next space.
+
+        A scanner starting within a docstring, as it does when it has been
+        moved to a line of one, hands out the rest of the docstring first.
         """
         token = None
-        in_doc = False
+        read_span = self.scanner.read_span
+        identifiers = self.scanner.identifiers
+
+        if self.scanner.doc:
+            yield self._docstring(self._position())
 
         while True:
             try:
-                char = self.scanner()
+                span = read_span()
 
-                if char.isspace():
+                if span[0].isspace():
                     #
                     # 1. A space is detected, and a token is being built.
                     #
-                    if token is not None and token != Symbol.INDENT:
-                        yield token()
+                    if token is not None and token.symbol is not Symbol.INDENT:
+                        yield token(identifiers)
 
                     #
                     # 2. A space is detected, and an indent token is being
                     #    built.
                     #
-                    elif token is not None and token == Symbol.INDENT:
-                        token += ' '
+                    elif token is not None and token.symbol is Symbol.INDENT:
+                        token = yield from self._indent(token, span)
                         continue
 
                     #
                     # 3. If the space is a feed line character, the generator
                     #    inserts a new EOL token.
                     #
-                    if char == '\n':
-                        yield Token('\n', self.scanner, in_doc)
+                    if span == '\n':
+                        yield Token('\n', self.scanner, self.scanner.doc)
 
                     token = None
 
@@ -145,7 +273,7 @@ class Lexer:
                     #    beginning of an indent.
                     #
                     if self.scanner.offset == 0:
-                        token = Token(' ', self.scanner, in_doc)
+                        token = yield from self._indent(Token(' ', self.scanner, self.scanner.doc), span[1:])
                         continue
 
                     #
@@ -157,8 +285,8 @@ class Lexer:
                 # 6. If it is not a space and it ends an indent, the generator
                 #    returns the indent first
                 #
-                if token is not None and token == Symbol.INDENT:
-                    yield token()
+                if token is not None and token.symbol is Symbol.INDENT:
+                    yield token(identifiers)
                     token = None
 
                 #
@@ -166,51 +294,702 @@ class Lexer:
                 #    start defining a new token
                 #
                 if token is None:
-                    token = Token(char, self.scanner, in_doc)
-                    if token == Symbol.COLON:
+                    token = self._start(span)
+                    if token.symbol is Symbol.COLON:
                         raise LythSyntaxError(token.info, msg=LythError.TOO_MUCH_SPACE_BEFORE)
 
                 #
-                # 8. A colon token is following directly another token
+                # 8. A colon token is following directly another token. The
+                #    token is yielded as it is, but a name is finalized to be
+                #    interned.
+                #
+                elif token is not None and span == ':':
+                    yield token(identifiers) if token.symbol is Literal.STRING else token
+                    token = Token(span, self._position(), self.scanner.doc)
+
+                #
+                # 9. The span starts a new token, although no space separates
+                #    it from the current one.
                 #
-                elif token is not None and char == ':':
-                    yield token
-                    token = Token(char, self.scanner, in_doc)
+                elif token.splits(span):
+                    yield token(identifiers)
+                    token = self._start(span)
 
                 #
-                # 9. If it is not a space and a token is present, then we
-                #     append the character to the token.
+                # 10. If it is not a space and a token is present, then we
+                #     append the span to the token.
                 #
                 else:
-                    token += char
+                    token += span
 
-                    # 10. One quote leads to a quote token, two quotes lead to two quote
-                    #    tokens, three quotes lead to a doc token.
-                    if token == Symbol.QUOTE and token.quotes == 3:
-                        yield Token('"""', self.scanner, in_doc)()
-                        in_doc = not in_doc
+                    # 11. One quote leads to a quote token, two quotes lead to two quote
+                    #    tokens, three quotes lead to a doc token, holding
+                    #    the whole docstring.
+                    if token.symbol is Symbol.QUOTE and token.quotes == 3:
+                        yield self._docstring(self._position())
                         token = None
 
+            except LythSyntaxError as error:
+                if not self.recover:
+                    raise
+
+                yield self._recover(error)
+                token = None
+
             except StopIteration:
                 if token is not None and (token.symbol is not Symbol.EOL or token.lineno != 0):
-                    raise LythSyntaxError(token.info, msg=LythError.MISSING_EMPTY_LINE) from None
+                    error = LythSyntaxError(token.info, msg=LythError.MISSING_EMPTY_LINE)
+
+                    if not self.recover:
+                        raise error from None
 
-                yield Token(None, self.scanner, in_doc)
+                    self.diagnostics.append(error)
+
+                yield Token(None, self.scanner, self.scanner.doc)
                 break
 
-            except LythSyntaxError as error:
-                if error.msg is LythError.MISSING_SPACE_AFTER_OPERATOR:
-                    if token is not None and token.symbol in (Symbol.ADD, Symbol.SUB, Symbol.LPAREN):
-                        yield token()
-                        token = Token(char, self.scanner, in_doc)
-                        continue
+    def peek(self, k: int = 0) -> Token:
+        """
+        Look at the token k tokens ahead of the next one, without consuming it.
+
+        The next token is peek(0), and is the one advance() returns. The tokens
+        up to the one looked at are lexed, if they were not yet, and stored in
+        the ring buffer until they are consumed.
+
+        Raises:
+            ValueError: The token is further ahead than the ring buffer holds.
+            StopIteration: The source ends before the token.
+        """
+        if not 0 <= k < _LOOKAHEAD:
+            raise ValueError(f"Tokens can be looked at most {_LOOKAHEAD - 1} tokens ahead, not {k}")
+
+        while self._count <= k:
+            self._ahead[(self._head + self._count) % _LOOKAHEAD] = next(self._stream)
+            self._count += 1
+
+        return self._ahead[(self._head + k) % _LOOKAHEAD]
+
+    @classmethod
+    def tokenize_parallel(cls, source: str, workers: Optional[int] = None, filename: str = "<stdin>",
+                          chunk_size: int = 1 << 20) -> TokenBuffer:
+        """
+        Lex a whole source into a token buffer, in a pool of processes.
+
+        At the beginning of a line, the state of the lexer comes down to
+        whether a docstring is open, unless a token spills over from the
+        previous line. The source is split into chunks of about chunk_size
+        characters or more, one per worker at most, at lines no token spills
+        into, and out of docstrings. The chunks are lexed by the workers, and
+        their buffers appended in order, their positions shifted to the ones of
+        the whole source.
+
+        The buffer is the one tokenize_all() returns. A source too small to be
+        split is lexed in this process. The token cache, if set, is looked up
+        before lexing and filled after, as tokenize_all() does.
+
+        Raises:
+            LythSyntaxError: The source could not be lexed. This is the first
+                             error in the source, as a serial lexer raises.
+        """
+        scanner = Scanner(source, filename)
+        key = cls.cache.key(scanner) if cls.cache is not None else None
+        buffer = cls.cache.load(key, scanner.source_id) if key is not None else None
+
+        if buffer is not None:
+            return buffer
+
+        workers = workers or os.cpu_count() or 1
+        count = min(workers, len(source) // max(chunk_size, 1))
+
+        #
+        # 1. Cut the source after a feed line, at about every count-th of its
+        #    length, and further down as long as the line before spills, or a
+        #    docstring is open, a docstring being a single token.
+        #
+        cuts = [0]
+        linenos = [scanner.lineno]
+        lineno = scanner.lineno
+
+        for target in range(1, count):
+            cut = source.find('\n', max(target * len(source) // count, cuts[-1])) + 1
+            lineno += source.count('\n', cuts[-1], cut)
+
+            while 0 < cut < len(source):
+                if scanner.spills(lineno - 1):
+                    end = cut
+
+                elif source.count('"""', 0, cut) % 2:
+                    end = source.find('"""', cut)
+
+                else:
+                    break
+
+                end = source.find('\n', end) + 1 if end >= 0 else 0
+                lineno += source.count('\n', cut, end)
+                cut = end
+
+            if not 0 < cut < len(source):
+                break
+
+            cuts.append(cut)
+            linenos.append(lineno)
+
+        if len(cuts) < 2:
+            return cls(scanner).tokenize_all()
+
+        #
+        # 2. The docstring state of a chunk is the parity of the triple quotes
+        #    before it, and its positions are shifted by the length of the
+        #    source before it, once normalised.
+        #
+        indexes = [scanner.line_start(lineno) for lineno in linenos]
+        docs = [scanner.text(0, index).count('"""') % 2 == 1 for index in indexes]
+        texts = [source[begin:end] for begin, end in zip(cuts, cuts[1:] + [len(source)])]
+        lasts = [False] * (len(texts) - 1) + [True]
+
+        #
+        # 3. The chunks are stitched back in order. The first error met is the
+        #    one a serial lexer would have raised.
+        #
+        buffer = TokenBuffer(scanner.source_id)
+
+        with ProcessPoolExecutor(max_workers=len(texts)) as pool:
+            for (chunk, error), index in zip(pool.map(_tokenize_chunk, [cls] * len(texts), texts, linenos, docs, lasts),
+                                             indexes):
+                if error is not None:
+                    info = error.info
+                    info = TokenInfo(scanner.source_id, info.lineno, info.offset,
+                                     index=info.index + index if info.index >= 0 else info.index)
+                    raise LythSyntaxError(info, msg=error.msg)
+
+                buffer.extend(chunk, index)
+
+        if key is not None:
+            cls.cache.store(key, buffer)
+
+        return buffer
+
+    def tokenize_all(self) -> TokenBuffer:
+        """
+        Lex the whole source into a token buffer.
+
+        Tokens are produced one by one, and stored in the arrays of the buffer
+        rather than kept, so that a whole source can be held and walked
+        through without a Python object per token.
+
+        If the lexer has not started yet, the buffer is loaded from the token
+        cache if it holds the source, or stored in it once lexed otherwise.
+
+        Raises:
+            LythSyntaxError: The source could not be lexed.
+        """
+        cache = self.cache
+        key = None
+
+        if cache is not None and not self._count and inspect.getgeneratorstate(self._stream) == inspect.GEN_CREATED:
+            key = cache.key(self.scanner)
+            buffer = cache.load(key, self.scanner.source_id) if key is not None else None
+
+            if buffer is not None:
+                self._stream.close()
+                return buffer
+
+        if key is None:
+            return TokenBuffer.from_tokens(self, self.scanner.source_id)
+
+        self._stream.close()
+        buffer = TokenBuffer.from_tokens(self.next(), self.scanner.source_id)
+
+        if not self.diagnostics:
+            cache.store(key, buffer)
+
+        return buffer
+
+    def _tokens(self) -> Generator[Token, None, None]:
+        """
+        The tokens of the source, replayed from the token cache if it holds
+        them, and lexed otherwise.
+
+        The tokens are lexed by next(). If a cache is set, they are also
+        appended to a buffer as they are lexed, which is stored in the cache
+        once the end of file has been reached. A source which could not be
+        lexed, even if the lexer recovered from its errors, or which has not
+        been lexed in full, is not stored.
+        """
+        cache = self.cache
+        key = cache.key(self.scanner) if cache is not None else None
+
+        if key is None:
+            yield from self.next()
+            return
+
+        buffer = cache.load(key, self.scanner.source_id)
+
+        if buffer is not None:
+            yield from buffer
+            return
+
+        buffer = TokenBuffer(self.scanner.source_id)
+
+        for token in self.next():
+            buffer.append(token)
+            yield token
+
+        if not self.diagnostics:
+            cache.store(key, buffer)
+
+    def _docstring(self, scan: Union[Scanner, TokenInfo]) -> Token:
+        """
+        Read a docstring as a whole, from its opening quotes, or from where the
+        scanner is within it, and return its doc token.
+
+        Rather than lexing the docstring, and building its lexeme character by
+        character, the closing quotes are looked for in the source at once.
+        The doc token is positioned on the quotes opening the docstring, and
+        holds its text as its lexeme. A docstring which is not closed runs up
+        to the end of the source, where the scanner is left within it.
+        """
+        token = Token('"""', scan)
+        token.lexeme, closed = self.scanner.read_until('"""')
+        self.scanner.doc = not closed
+        return token
+
+    def _indent(self, token: Token, spaces: str) -> Generator[Token, None, Optional[Token]]:
+        """
+        Append spaces to an indent token being built.
+
+        Within a docstring, an indent becomes a string once it is appended a
+        space, which ends it: the string is yielded, following spaces are
+        ignored, and no token is left to build.
+        """
+        if not token.literal:
+            return token + ' ' * len(spaces) if spaces else token
+
+        for _ in spaces:
+            if token.symbol is not Symbol.INDENT:
+                yield token()
+                return None
+
+            token += ' '
+
+        return token
+
+    def _position(self) -> Union[Scanner, TokenOffset]:
+        """
+        What a token is positioned from: the scanner, or in positions mode, the
+        offset of the character being scanned.
+        """
+        return TokenOffset.capture(self.scanner) if self.positions else self.scanner
+
+    def _recover(self, error: LythSyntaxError) -> Token:
+        """
+        Record an error, and resynchronise the lexer on the next space.
+
+        The spans are skipped up to the next space, or the end of line, which
+        is left to the lexer. The error token is positioned where the error was
+        raised, and its lexeme is the text skipped from there.
+        """
+        self.diagnostics.append(error)
+        scanner = self.scanner
+        mark = scanner.mark()
+
+        while True:
+            try:
+                span = scanner.read_span()
+
+            except StopIteration:
+                break
+
+            if span[0].isspace():
+                scanner.reset(mark)
+                break
+
+            mark = scanner.mark()
+
+        info = error.info
+        lexeme = scanner.text(info.index, scanner.resume[0]) if info.index >= 0 else ''
+        return Token.make(Sentinel.ERROR, lexeme, TokenInfo.capture(info), scanner.doc)
+
+    def _start(self, span: str) -> Token:
+        """
+        Start a new token from the span being scanned.
+
+        The token is created from the first character of the span, and the
+        rest of the span is appended to it, so that keywords are recognized as
+        they would be character by character.
+        """
+        token = Token(span[0], self._position(), self.scanner.doc)
+        return token + span[1:] if len(span) > 1 else token
+
+
+class RegexLexer(Lexer):
+    """
+    A lexical analyzer matching the source against a single regular expression.
+
+    The master expression is compiled from the symbols: it recognizes the
+    longest symbol at a position, runs of letters, runs of digits, and runs of
+    spaces, line by line. The token a run of characters starts is looked up in
+    a table, filled the first time the run is met, so that keywords, symbols
+    and literals are recognized at the cost of a dictionary lookup.
 
-                elif error.msg is LythError.MISSING_SPACE_BEFORE_OPERATOR:
-                    new_token = Token(char, self.scanner, in_doc)
-                    if new_token.symbol is Symbol.RPAREN \
-                       or token.symbol is Literal.STRING and new_token.symbol is Symbol.LPAREN:
-                        yield token()
-                        token = new_token
+    Runs of characters separated by spaces make the bulk of a source. When a
+    run follows another one without a space in between, it is appended to the
+    token being built span by span, exactly as the Lexer does, so that both
+    produce the same tokens and raise the same errors.
+
+    The source is read line by line from the scanner, which must hold strings.
+    Other sources, and sources lexed in recovery mode, are lexed by the Lexer.
+    """
+    def __init__(self, scanner: Scanner, recover: bool = False, positions: bool = False) -> None:
+        """
+        Instantiate the lexer, with an empty table of tokens, one for the
+        source and another one for docstrings.
+        """
+        self._table: Tuple[Dict[str, Union[tuple, LythError]], ...] = ({}, {})
+        super().__init__(scanner, recover, positions)
+
+    def next(self) -> Generator[Token, None, None]:
+        """
+        Get the next token in source being scanned.
+
+        The cases of the Lexer are handled the same way, the only difference
+        being that a run of characters following a space starts a token from
+        the table.
+        """
+        scanner = self.scanner
+
+        if not isinstance(scanner.data, str) or self.recover:
+            yield from super().next()
+            return
+
+        source_id = scanner.source_id
+        identifiers = scanner.identifiers
+
+        if scanner.doc:
+            yield self._docstring(self._position())
+
+        positions = self.positions
+        doc = scanner.doc
+        table = self._table[doc]
+        token = None
+
+        while True:
+            index, lineno, column, half = scanner.resume
+
+            try:
+                line = scanner.read_line()
+
+            except StopIteration:
+                break
+
+            resume = scanner.resume
+
+            tabs = scanner.tabs(lineno)
+            column += 1
+            position = 0
+
+            # The second space of a tabulation, when the line begins with it,
+            # is not in the source.
+            for unit in _UNITS.findall(line) if half else self._units(line, index):
+                start = position
+                position += len(unit)
+                col = column + start
+                char = unit[0]
+
+                if char == ' ' or char == '\n' or char.isspace():
+                    #
+                    # 1. A space is detected, and a token is being built.
+                    #
+                    if token is not None and token.symbol is not Symbol.INDENT:
+                        yield token(identifiers)
+
+                    #
+                    # 2. A space is detected, and an indent token is being
+                    #    built.
+                    #
+                    elif token is not None:
+                        token = yield from self._indent(token, unit)
                         continue
 
-                raise
+                    token = None
+
+                    #
+                    # 3. If the space is a feed line character, an EOL token
+                    #    is inserted, positioned on the last character. If
+                    #    this is the first column, an indent begins.
+                    #
+                    if char == '\n':
+                        offset = col - 1 - bisect_left(tabs, col - 1) if tabs else col - 1
+                        info = TokenInfo(source_id, lineno, offset, index=index + start)
+                        yield Token.make(Symbol.EOL, '\n', info, doc)
+
+                        if offset == 0:
+                            info = TokenInfo(source_id, lineno, 0, index=index + start)
+                            token = Token.make(Symbol.INDENT, ' ', info, doc)
+
+                    #
+                    # 4. If the space is in the first column, this is the
+                    #    beginning of an indent. Spaces being a run, there is
+                    #    no need to look for tabulations before them.
+                    #
+                    elif col == 0:
+                        info = TokenInfo(source_id, lineno, 0, index=index + start)
+                        token = yield from self._indent(Token.make(Symbol.INDENT, ' ', info, doc), unit[1:])
+
+                    continue
+
+                if positions:
+                    info = TokenOffset(source_id, index + start)
+
+                else:
+                    offset = col - bisect_left(tabs, col) if tabs else col
+                    info = TokenInfo(source_id, lineno, offset, index=index + start)
+
+                #
+                # 5. If it is not a space and it ends an indent, the indent is
+                #    yielded first.
+                #
+                if token is not None and token.symbol is Symbol.INDENT:
+                    yield token(identifiers)
+                    token = None
+
+                #
+                # 6. If no token is present, the token is started from the
+                #    table.
+                #
+                if token is None:
+                    state = table.get(unit)
+
+                    if state is None:
+                        state = table[unit] = self._prepare(unit, info)
+
+                    if state.__class__ is LythError:
+                        raise LythSyntaxError(info, msg=state)
+
+                    symbol, lexeme, literal, quotes = state
+                    if symbol is Symbol.COLON:
+                        raise LythSyntaxError(info, msg=LythError.TOO_MUCH_SPACE_BEFORE)
+
+                    token = Token.make(symbol, lexeme, info, literal, quotes)
+                    continue
+
+                #
+                # 7. Otherwise, the run is appended to the token span by span,
+                #    the way the Lexer does. Docstrings may begin or end there.
+                #
+                for span in _SPANS.findall(unit):
+                    token = yield from self._append(token, span, info)
+                    if len(unit) > 1 and positions:
+                        info = TokenOffset(source_id, info.index + 1)
+
+                    elif len(unit) > 1:
+                        info = TokenInfo(source_id, lineno, info.offset + 1, index=info.index + 1)
+
+                if scanner.doc is not doc:
+                    doc = scanner.doc
+                    table = self._table[doc]
+
+                #
+                # 8. A docstring has been read as a whole, from the middle of
+                #    the line: the scanner resumes after it.
+                #
+                if scanner.resume is not resume:
+                    break
+
+        if token is not None:
+            raise LythSyntaxError(token.info, msg=LythError.MISSING_EMPTY_LINE)
+
+        yield Token(None, scanner, scanner.doc)
+
+    def _units(self, line: str, index: int) -> List[str]:
+        """
+        Split a line, beginning at an absolute index in the source, into the
+        runs of characters the master expression recognizes.
+
+        The runs cover the whole line, one after the other.
+        """
+        return _UNITS.findall(line)
+
+    def _append(self, token: Optional[Token], span: str, info: TokenInfo) -> Generator[Token, None, Optional[Token]]:
+        """
+        Append a span following a token without a space in between.
+
+        This is the Lexer handling a span that is not a space, a colon ending
+        the token, quotes making a docstring, and the spans starting a new token
+        although no space separates them from the current one. As the line has
+        already been read, the scanner is moved back after the quotes opening a
+        docstring, before the docstring is read.
+        """
+        doc = self.scanner.doc
+
+        if token is None:
+            token = self._start_at(span, info)
+            if token.symbol is Symbol.COLON:
+                raise LythSyntaxError(token.info, msg=LythError.TOO_MUCH_SPACE_BEFORE)
+
+        elif span == ':':
+            yield token(self.scanner.identifiers) if token.symbol is Literal.STRING else token
+            token = Token(span, info, doc)
+
+        elif token.splits(span):
+            yield token(self.scanner.identifiers)
+            token = self._start_at(span, info)
+
+        else:
+            token += span
+
+            if token.symbol is Symbol.QUOTE and token.quotes == 3:
+                self.scanner.seek_index(info.index + 1)
+                self.scanner.doc = False
+                yield self._docstring(info)
+                token = None
+
+        return token
+
+    def _prepare(self, unit: str, info: TokenInfo) -> Union[tuple, LythError]:
+        """
+        The state of a token started from a run of characters, or the error
+        starting it raises, to be stored in the table.
+        """
+        try:
+            token = self._start_at(unit, info)
+
+        except LythSyntaxError as error:
+            return error.msg
+
+        return token.symbol, token.lexeme, token.literal, token.quotes
+
+    def _start_at(self, span: str, info: TokenInfo) -> Token:
+        """
+        Start a new token from a span, at a given position.
+        """
+        token = Token(span[0], info, self.scanner.doc)
+        return token + span[1:] if len(span) > 1 else token
+
+
+class NumpyLexer(RegexLexer):
+    """
+    A lexical analyzer splitting the source into runs of characters with NumPy.
+
+    Rather than matching every line against the master expression, the source
+    is classified by blocks of lines: each character is given a class, letter,
+    digit, space, feed line or other, by indexing a table with its code. A run
+    begins where the class changes, and at every other character, unless it
+    ends a symbol of two characters. The runs are the ones the expression
+    matches, and are handed to the RegexLexer, so that both produce the same
+    tokens and raise the same errors.
+
+    This pays off on large sources only, NumPy taking some time to get started
+    on each block. If NumPy is not installed, this is the RegexLexer.
+    """
+    block: int = 1 << 20  # The number of characters classified at once.
+
+    def __init__(self, scanner: Scanner, recover: bool = False, positions: bool = False) -> None:
+        """
+        Instantiate the lexer, with no block classified yet.
+        """
+        self._begin: int = 0
+        self._end: int = 0
+        self._block: str = ''
+        self._bounds: List[int] = []
+        super().__init__(scanner, recover, positions)
+
+    def _classify(self, index: int, size: int) -> None:
+        """
+        Classify the block of lines beginning at an absolute index in the
+        source, at least size characters long, and find the runs in it.
+
+        The block is the text of the source, normalised, cut after the last
+        feed line it holds, so that it ends with a line. The starts of the runs
+        are kept relative to the block, followed by its length.
+        """
+        text = self.scanner.text(index, index + max(self.block, size))
+
+        if len(text) > size:
+            cut = text.rfind('\n', size - 1) + 1
+            text = text[:cut] if cut else text
+
+        if text.isascii():
+            codes = numpy.frombuffer(text.encode('ascii'), dtype=numpy.uint8)
+            classes = _CLASSES[codes]
+
+        else:
+            codes = numpy.frombuffer(text.encode('utf-32-le'), dtype=numpy.uint32)
+            wide = codes >= 128
+            classes = _CLASSES[numpy.where(wide, 0, codes)]
+            chars, inverse = numpy.unique(codes[wide], return_inverse=True)
+            classes[wide] = numpy.array([_class(chr(char)) for char in chars.tolist()], dtype=numpy.uint8)[inverse]
+            codes = numpy.where(wide, 0, codes).astype(numpy.uint8)
+
+        #
+        # 1. A run begins where the class changes, and on every character which
+        #    is neither a letter, a digit nor a space.
+        #
+        starts = numpy.empty(len(text), dtype=bool)
+        starts[:1] = True
+        starts[1:] = (classes[1:] != classes[:-1]) | (classes[1:] == _OTHER) | (classes[1:] == _EOL)
+
+        #
+        # 2. Two characters making a symbol are a single run. The expression
+        #    matches symbols from left to right, so that within a chain of such
+        #    pairs, as in '<--', only every other pair is a symbol.
+        #
+        pairs = numpy.zeros(len(text), dtype=bool)
+        pairs[:-1] = _PAIRS[codes[:-1], codes[1:]]
+
+        if pairs.any():
+            positions = numpy.arange(len(text))
+            first = pairs.copy()
+            first[1:] &= ~pairs[:-1]
+            chains = numpy.maximum.accumulate(numpy.where(first, positions, 0))
+            pairs &= (positions - chains) % 2 == 0
+            starts[1:] &= ~pairs[:-1]
+
+        self._begin, self._end, self._block = index, index + len(text), text
+        self._bounds = numpy.flatnonzero(starts).tolist() + [len(text)]
+
+    def _units(self, line: str, index: int) -> List[str]:
+        """
+        Split a line into runs, from the block of lines holding it.
+
+        The block is classified when the line is the first one out of the
+        block classified last.
+        """
+        if numpy is None:
+            return _UNITS.findall(line)
+
+        if index < self._begin or index + len(line) > self._end:
+            self._classify(index, len(line))
+
+        begin = index - self._begin
+        end = begin + len(line)
+        bounds = self._bounds
+        text = self._block
+        first = bisect_left(bounds, begin)
+        last = bisect_left(bounds, end, first)
+        return [text[start:stop] for start, stop in zip(bounds[first:last], bounds[first + 1:last + 1])]
+
+
+def _class(char: str) -> int:
+    """
+    The class of a character, as the master expression tells runs apart.
+    """
+    if char == '\n':
+        return _EOL
+
+    if char == ' ':
+        return _SPACE
+
+    if char.isdecimal():
+        return _DIGIT
+
+    return _LETTER if char == '_' or char.isalnum() else _OTHER
+
+
+if numpy is not None:
+    _CLASSES = numpy.array([_class(chr(code)) for code in range(128)], dtype=numpy.uint8)
+    _PAIRS = numpy.zeros((128, 128), dtype=bool)
+
+    for _symbol in Symbol:
+        if _symbol.value and len(_symbol.value) == 2:
+            _PAIRS[ord(_symbol.value[0]), ord(_symbol.value[1])] = True
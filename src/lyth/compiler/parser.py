@@ -4,13 +4,22 @@ This module contains the parser.
 The Parser uses the Lexer to retrieve a series of tokens, and based on these
 tokens, it performs syntax analysis. It should give an Abstract Syntax Tree in
 the end.
+
+Operations are parsed by precedence climbing: the precedence of an operator is
+a binding power looked up in a table, rather than a method of its own.
+
+The rules of the grammar are run on an explicit stack, rather than on the stack
+of Python, so that there is no limit to how deep parentheses and blocks nest.
 """
 from __future__ import annotations
 
+from typing import Any
+from typing import Dict
 from typing import Generator
 from typing import List
 from typing import Optional
 from typing import Tuple
+from typing import Union
 
 from lyth.compiler.ast import Node
 from lyth.compiler.ast import NodeType
@@ -22,6 +31,35 @@ from lyth.compiler.token import Literal
 from lyth.compiler.token import Symbol
 from lyth.compiler.token import Token
 
+# The binding powers of operators, the higher the tighter. Binary operators of
+# a same power are left associative. A prefix operator applies to the chain of
+# operations binding tighter than it. A leading '-' is a negation, 'at' takes
+# the address of its member, and 'of' and '.' bind tighter than any of them.
+# The increment and decrement idioms, '++' and '--', are statements rather
+# than operators, and are not part of expressions.
+_INFIX: Dict[Union[Symbol, Keyword], int] = {
+    Keyword.OR: 1,
+    Keyword.AND: 2,
+    Symbol.EQ: 4, Symbol.DIFF: 4, Symbol.LT: 4, Symbol.LTE: 4, Symbol.GT: 4, Symbol.GTE: 4, Keyword.IN: 4, Keyword.IS: 4,
+    Symbol.RANGE: 5,
+    Symbol.OR: 6,
+    Symbol.XOR: 7,
+    Symbol.AND: 8,
+    Symbol.LSHIFT: 9, Symbol.RSHIFT: 9,
+    Symbol.ADD: 10, Symbol.SUB: 10,
+    Symbol.MUL: 11, Symbol.DIV: 11, Symbol.FLOOR: 11, Symbol.MOD: 11,
+    Keyword.OF: 13,
+    Symbol.DOT: 14,
+}
+_PREFIX: Dict[Union[Symbol, Keyword], int] = {
+    Keyword.NOT: 3,
+    Symbol.FLIP: 12, Symbol.SUB: 12, Keyword.AT: 12,
+}
+
+# A rule of the grammar, as a generator yielding the routines it calls, and
+# sent back their results.
+Routine = Generator[Any, Any, Any]
+
 
 class Parser:
     """
@@ -32,12 +70,11 @@ class Parser:
         Instantiate a new parser object.
 
         The lexer requires an instance of a lexer on a source of characters.
-        It can be anything that is an iterable, a generator that eventually
-        raises StopIteration, as long as it returns tokens.
+        It can be anything that looks tokens ahead with peek(), and consumes
+        them with advance(), raising StopIteration once the tokens run out.
         """
         self.indent = 0
         self.lexer: Lexer = lexer
-        self.token: Token = None
         self._stream: Generator[Token, None, None] = self._next()
 
     def __call__(self) -> Node:
@@ -68,6 +105,163 @@ class Parser:
         """
         return next(self._stream)
 
+    def _assign(self) -> Generator[Routine, Node, Node]:
+        """
+        The routine behind assign().
+        """
+        node, let = yield self._let()  # There can be an optional let in assign statement.
+        token = self.lexer.peek()
+
+        if token == Symbol.LASSIGN:
+            if node.name not in (NodeType.Name, NodeType.Let):
+                raise LythSyntaxError(node.info, msg=LythError.LEFT_MEMBER_IS_EXPRESSION)
+
+            self.lexer.advance()
+            node = Node(token, node, (yield self._expression()))
+
+        elif token == Symbol.RASSIGN:
+            self.lexer.advance()
+            node = Node(token, self.name(), node)
+
+            if self.lexer.peek() != Symbol.EOL:
+                raise LythSyntaxError(node.info, msg=LythError.GARBAGE_CHARACTERS)
+
+        elif let and node.name != NodeType.Class:
+            raise LythSyntaxError(let.info, msg=LythError.LET_ON_EXPRESSION)
+
+        end = self.lexer.peek()
+        if end == Symbol.EOL or end == Symbol.EOF and node.name is NodeType.Noop:
+            self.lexer.advance()
+
+        elif end in (Symbol.LASSIGN, Symbol.RASSIGN):
+            raise LythSyntaxError(end.info, msg=LythError.GARBAGE_CHARACTERS)
+
+        return Node(let, node) if let is not None else node
+
+    def _block(self) -> Generator[Routine, Node, List[Node]]:
+        """
+        The routine behind block().
+        """
+        statements = []
+        self.indent += 1
+
+        while True:
+            new_token = self.lexer.peek()
+
+            if new_token == Symbol.EOL:
+                self.lexer.advance()
+                continue
+
+            if new_token == Symbol.EOF:
+                return statements
+
+            if new_token != Symbol.INDENT:
+                raise LythSyntaxError(new_token.info, msg=LythError.INCONSISTENT_INDENT)
+
+            if new_token.lexeme <= self.indent - 1:
+                self.indent = new_token.lexeme
+                return statements
+
+            if new_token.lexeme != self.indent:
+                raise LythSyntaxError(new_token.info, msg=LythError.INCONSISTENT_INDENT)
+
+            self.lexer.advance()
+            statements.append((yield self._assign()))
+
+    def _classdef(self, name: Node) -> Generator[Routine, List[Node], Node]:
+        """
+        The routine behind classdef().
+        """
+        token = self.lexer.advance()
+
+        if token == Keyword.BE:
+            type_node = Node.typedef(self.name())
+            token = self.lexer.advance()
+
+        else:
+            type_node = None
+
+        if token != Symbol.COLON:
+            raise LythSyntaxError(token.info, msg=LythError.GARBAGE_CHARACTERS)
+
+        return Node.classdef(name, type_node, *(yield self._block()))
+
+    def _expression(self, end: Symbol = Symbol.EOL) -> Generator[Routine, Node, Node]:
+        """
+        The routine behind expression().
+        """
+        node = yield self._operation()
+        token = self.lexer.peek()
+
+        if token in (Symbol.LASSIGN, Symbol.RASSIGN):
+            return node
+
+        elif node.name == NodeType.Name and token in (Symbol.COLON, Keyword.BE):
+            return (yield self._classdef(node))
+
+        elif token.symbol is not end and (node.name is not NodeType.Noop or end is not Symbol.EOL):
+            raise LythSyntaxError((token if node.name is NodeType.Noop else node).info, msg=LythError.GARBAGE_CHARACTERS)
+
+        return node
+
+    def _let(self) -> Generator[Routine, Union[Node, List[Node]], Tuple[Node, Optional[Token]]]:
+        """
+        The routine behind let().
+        """
+        token = self.lexer.peek()
+
+        #
+        # 1. Multiple statements let
+        #
+        if token == Keyword.LET and self.lexer.peek(1) == Symbol.COLON:
+            self.lexer.advance()
+            self.lexer.advance()
+            eol = self.lexer.advance()
+
+            if eol != Symbol.EOL:
+                raise LythSyntaxError(eol.info, msg=LythError.GARBAGE_CHARACTERS)
+
+            return Node(token, *(yield self._block())), None
+
+        #
+        # 2. Single statement let
+        #
+        if token == Keyword.LET:
+            self.lexer.advance()
+            return (yield self._expression()), token
+
+        #
+        # 3. No let detected
+        #
+        return (yield self._expression()), None
+
+    def _literal(self) -> Optional[Node]:
+        """
+        The part of literal() that does not nest.
+
+        It returns None once it has consumed an opening parenthesis, leaving
+        the expression up to the closing parenthesis to the caller.
+        """
+        token = self.lexer.peek()
+
+        while token == Symbol.DOC:
+            self.lexer.advance()
+            self.docstring()
+            token = self.lexer.peek()
+
+        if token in (Symbol.EOF, Symbol.EOL):
+            raise LythSyntaxError(token.info, msg=LythError.INCOMPLETE_LINE)
+
+        self.lexer.advance()
+
+        if token == Symbol.LPAREN:
+            return None
+
+        elif token not in (Literal.VALUE, Literal.STRING):
+            raise LythSyntaxError(token.info, msg=LythError.LITERAL_EXPECTED)
+
+        return Node(token)
+
     def _next(self) -> Node:
         """
         Looking for an assignment, starting with an expression first.
@@ -80,49 +274,138 @@ class Parser:
                 break
 
             yield node
-            self.token = None
 
-    def addition(self) -> Node:
+    def _operation(self, power: int = 0) -> Generator[Routine, Node, Node]:
         """
-        Looking for a token that could lead to an addition or a substraction.
+        The routine behind operation().
+
+        Instead of calling itself for the right member of an operator, it keeps
+        the operators waiting for their right member on a stack of frames. Each
+        frame holds the power to go back to, the left member, or None for a
+        prefix operator, and the operator token.
+        """
+        frames: List[Tuple[int, Optional[Node], Token]] = []
+
+        while True:
+            #
+            # 1. Operand, or prefix operator waiting for one
+            #
+            token = self.lexer.peek()
+            prefix = _PREFIX.get(token.symbol)
+
+            if prefix is not None:
+                self.lexer.advance()
+                frames.append((power, None, token))
+                power = prefix
+                continue
+
+            try:
+                node = self._literal()
+
+                if node is None:
+                    node = yield self._parenthesis()
+
+            except LythSyntaxError as lse:
+                if lse.msg is LythError.INCOMPLETE_LINE and not power:
+                    return Node.noop()
+
+                raise
+
+            #
+            # 2. Operators, either binding tighter, or closing a frame
+            #
+            while True:
+                token = self.lexer.peek()
+                infix = _INFIX.get(token.symbol)
+
+                if infix is not None and infix > power:
+                    self.lexer.advance()
+                    frames.append((power, node, token))
+                    power = infix
+                    break
 
-        It returns the result of a numeral, or a chain of additions. If an
-        unexpected symbol is discovered while itself is fetching the next
-        token, then it saves the token and return the current node.
+                if not frames:
+                    return node
 
-        If the left member is an end of line or an end of file, then it means
-        that we are starting with an empty line, and in this case, a Noop node
-        is being returned.
+                power, left, operator = frames.pop()
+
+                if left is not None:
+                    node = Node(operator, left, node)
+
+                else:
+                    node = Node.neg(operator, node) if operator == Symbol.SUB else Node(operator, node)
+
+    def _parenthesis(self) -> Generator[Routine, Node, Node]:
+        """
+        Looking for an expression up to a closing parenthesis, the opening one
+        being consumed already.
         """
-        try:
-            node = self.multiplication()
+        node = yield self._expression(end=Symbol.RPAREN)
 
-        except LythSyntaxError as lse:
-            if lse.msg is LythError.INCOMPLETE_LINE:
-                return Node.noop()
+        if self.lexer.peek() == Symbol.RPAREN:
+            self.lexer.advance()
 
-            raise
+        return node
+
+    def _run(self, routine: Routine) -> Any:
+        """
+        Run a routine, and the routines it calls, on a stack of its own.
+
+        The rules of the grammar nest into each other: a parenthesis holds an
+        expression, a let block holds assignments, and so on. Rather than
+        calling each other, and using up the stack of Python, which has a limit
+        of a thousand frames or so by default, the rules are generators, named
+        routines here. A routine yields the routine it would call, and it is
+        sent back the result of that routine once it is done.
+
+        1. The routine on top of the stack is resumed, with the result of the
+           routine it called, or with the exception that routine raised, so
+           that it can catch it as if it had called it.
+        2. If it yields a routine, this one is pushed on top of the stack.
+        3. If it returns, it is popped off, and its result goes to the routine
+           below. The result of the last routine is returned.
+        4. If it raises, it is popped off too, and the exception goes to the
+           routine below, or is raised if there is none left.
+
+        A generator cannot let a StopIteration through, which Python turns into
+        a RuntimeError. The StopIteration raised once the lexer runs out of
+        tokens is unwrapped, so that it reaches the caller as it is.
+        """
+        stack = [routine]
+        result, error = None, None
 
         while True:
-            token = self.token or next(self.lexer)
+            try:
+                call = stack[-1].send(result) if error is None else stack[-1].throw(error)
 
-            if token in (Symbol.ADD, Symbol.SUB):
-                self.token = None
-                node = Node(token, node, self.multiplication())
+            except StopIteration as stop:
+                stack.pop()
+                result, error = stop.value, None
 
-            else:
-                self.token = token
-                break
+                if not stack:
+                    return result
 
-        return node
+                continue
+
+            except Exception as exc:  # pylint: disable=broad-except
+                stack.pop()
+                error = exc.__cause__ if isinstance(exc, RuntimeError) and isinstance(exc.__cause__, StopIteration) else exc
+
+                if not stack:
+                    raise error
+
+                continue
+
+            stack.append(call)
+            result, error = None, None
 
     def assign(self) -> Node:
         """
         Based on a left-member expression, check that we are dealing with an
         assign, be mutable or immutable.
 
-        This method first looks for an expression. If the expressions exits,
-        then it has likely stored a token. We match this token against an
+        This method first looks for an expression. The expression leaves the
+        token it stopped on to be looked at. We match this token against an
         assign operator ('<-' or '->'). If the token does not match, then we
         return the expression node.
 
@@ -140,30 +423,12 @@ class Parser:
 
         If there is no assign operator, this method makes sure that there is no
         let keyword leading the orphan expression.
-        """
-        node, let = self.let()  # There can be an optional let in assign statement.
-
-        if self.token is not None and self.token == Symbol.LASSIGN:
-            if node.name not in (NodeType.Name, NodeType.Let):
-                raise LythSyntaxError(node.info, msg=LythError.LEFT_MEMBER_IS_EXPRESSION)
-
-            else:
-                token = self.token
-                self.token = None
-                node = Node(token, node, self.expression())
-
-        elif self.token is not None and self.token == Symbol.RASSIGN:
-            token = self.token
-            self.token = None
-            node = Node(token, self.name(), node)
-
-            if next(self.lexer) != Symbol.EOL:
-                raise LythSyntaxError(node.info, msg=LythError.GARBAGE_CHARACTERS)
-
-        elif let and node.name != NodeType.Class:
-            raise LythSyntaxError(let.info, msg=LythError.LET_ON_EXPRESSION)
 
-        return Node(let, node) if let is not None else node
+        The end of line ending the statement is consumed, as is the end of file
+        ending an empty line. The token ending a block is left to the block
+        enclosing it.
+        """
+        return self._run(self._assign())
 
     def block(self) -> List[Node]:
         """
@@ -172,34 +437,11 @@ class Parser:
         Original token is provided as parameter to help this method wraps the
         node around the token, fill its statement attribute and return it. For
         this, the block method requires the node constructor, and the token.
-        """
-        statements = []
-        self.indent += 1
-
-        while True:
-            new_token = self.token or self.lexer()
-
-            if new_token == Symbol.EOL:
-                self.token = None
-                continue
-
-            if new_token == Symbol.EOF:
-                self.token = new_token
-                return statements
-
-            if new_token != Symbol.INDENT:
-                raise LythSyntaxError(new_token.info, msg=LythError.INCONSISTENT_INDENT)
-
-            if new_token.lexeme <= self.indent - 1:
-                self.indent = new_token.lexeme
-                self.token = new_token
-                return statements
-
-            if new_token.lexeme != self.indent:
-                raise LythSyntaxError(new_token.info, msg=LythError.INCONSISTENT_INDENT)
-
-            statements.append(self.assign())
 
+        The block ends on an end of file, or on an indent of a block enclosing
+        it, which is left for that block to look at.
+        """
+        return self._run(self._block())
 
     def classdef(self, name: Node, end: Symbol = Symbol.EOL) -> Node:
         """
@@ -208,37 +450,15 @@ class Parser:
         Causes to fetch the block and append to the class node that is built
         subsequent lines of codes until the next dedent.
         """
-        token = self.token or next(self.lexer)
-
-        if token == Keyword.BE:
-            self.token = next(self.lexer)
-            type_node = Node.typedef(self.name())
-            token = next(self.lexer)
-
-        else:
-            # node = Node.classdef(name)
-            type_node = None
-
-        if token != Symbol.COLON:
-            raise LythSyntaxError(node_type.info, msg=LythError.GARBAGE_CHARACTERS)
-
-        self.token = None
-        try:
-            node = Node.classdef(name, type_node, *self.block())
-
-        except StopIteration:
-            raise
-
-        return node
+        return self._run(self._classdef(name))
 
     def docstring(self) -> None:
         """
         This version does not do anything with docstrings.
-        """
-        token = self.lexer()
 
-        while token != Symbol.DOC:
-            token = self.lexer()
+        The lexer hands a docstring out as a single doc token, holding its
+        text, so that there is nothing left to skip once it has been consumed.
+        """
 
     def expression(self, end: Symbol = Symbol.EOL) -> Node:
         """
@@ -250,30 +470,16 @@ class Parser:
 
         Expression raises an Exception if it detects trailing characters. The
         exception however, is bypassed in case of an assignment. In this case,
-        the expression returns the node, and the current assignment token for
-        the assign method to run.
+        the expression returns the node, and leaves the assignment token for
+        the assign method to consume.
 
         The end parameter determines the token the expression expects to stop.
         In some cases, expression is started by an opening parenthesis, then
         the method should have been called with an expected right parenthesis
         to stop it. The default token otherwise is the end of a line as multi
-        line is not yet supported by lyth.
+        line is not yet supported by lyth. The end token is left to the caller.
         """
-        node = self.addition()
-
-        if self.token in (Symbol.LASSIGN, Symbol.RASSIGN):
-            return node
-
-        elif node.name == NodeType.Name and self.token in (Symbol.COLON, Keyword.BE):
-            return self.classdef(node)
-
-        elif self.token is not None and self.token.symbol is not end:
-            print(node)
-            print(self.token)
-            raise LythSyntaxError(node.info, msg=LythError.GARBAGE_CHARACTERS)
-
-        self.token = None
-        return node
+        return self._run(self._expression(end))
 
     def let(self) -> Tuple[Node, Optional[Token]]:
         """
@@ -283,33 +489,7 @@ class Parser:
         symbol. It can be an assign, a class, an enum, a struct etc. or even a
         list of them.
         """
-        token = self.lexer()
-        if token == Keyword.LET:
-
-            next_token = self.lexer()
-
-            #
-            # 1. Multiple statements let
-            #
-            if next_token == Symbol.COLON:
-                eol = self.lexer()
-
-                if eol != Symbol.EOL:
-                    raise LythSyntaxError(eol.info, msg=LythError.GARBAGE_CHARACTERS)
-
-                return Node(token, *self.block()), None
-
-            #
-            # 2. Single statement let
-            #
-            self.token = next_token
-            return self.expression(), token
-
-        #
-        # 3. No let detected
-        #
-        self.token = token
-        return self.expression(), None
+        return self._run(self._let())
 
     def literal(self) -> Node:
         """
@@ -317,62 +497,19 @@ class Parser:
 
         Literal does not expect the line to be terminated, or the source code
         to have an end. If it is the case, then an exception saying that it was
-        unsuccessful is raised instead.
+        unsuccessful is raised instead, and the end of line is left for the
+        statement to end on.
 
         If the token is an opening parenthesis, then the corresponding node to
         return will not be a literal, rather a new expression needs to be
-        evaluated.
+        evaluated, up to the closing parenthesis.
 
         If the token being parsed is not a literal of type value, then it also
         raises an exception saying the symbol is invalid and that it should be
         a literal instead.
-
-        The token may already have been scanned by let. In all cases the
-        current token, even if none, must be consumed, otherwise the expression
-        will evaluate with a literal token.
-        """
-        token = self.token or self.lexer()
-        self.token = None
-        if token in (Symbol.EOF, Symbol.EOL):
-            raise LythSyntaxError(token.info, msg=LythError.INCOMPLETE_LINE)
-
-        elif token == Symbol.LPAREN:
-            return self.expression(end=Symbol.RPAREN)
-
-        elif token == Symbol.DOC:
-            self.docstring()
-            return self.literal()
-
-        elif token not in (Literal.VALUE, Literal.STRING):
-            raise LythSyntaxError(token.info, msg=LythError.LITERAL_EXPECTED)
-
-        return Node(token)
-
-    def multiplication(self) -> Node:
-        """
-        Looking for a token that could lead to a multiplication or a form of
-        division.
-
-        It returns the result of a literal, or a chain of multiplication. It
-        takes precedence over additions. If an unexpected symbol is discovered,
-        as it can be for example an addition which is less prioritary than it,
-        then it saves it and return the current node it is working on, that may
-        be a literal.
         """
-        node = self.literal()
-
-        while True:
-            token = self.token or next(self.lexer)
-
-            if token in (Symbol.MUL, Symbol.DIV, Symbol.FLOOR):
-                self.token = None
-                node = Node(token, node, self.literal())
-
-            else:
-                self.token = token
-                break
-
-        return node
+        node = self._literal()
+        return node if node is not None else self._run(self._parenthesis())
 
     def name(self) -> Node:
         """
@@ -382,7 +519,7 @@ class Parser:
         to have an end. If it is the case, then an exception saying that it was
         unsuccessful is raised instead.
         """
-        token = self.token or self.lexer()
+        token = self.lexer.advance()
 
         if token in (Symbol.EOF, Symbol.EOL):
             raise LythSyntaxError(token.info, msg=LythError.INCOMPLETE_LINE)
@@ -391,3 +528,24 @@ class Parser:
             raise LythSyntaxError(token.info, msg=LythError.NAME_EXPECTED)
 
         return Node(token)
+
+    def operation(self, power: int = 0) -> Node:
+        """
+        Looking for a chain of operations binding tighter than a given power.
+
+        It returns the result of an operand, or a chain of operations. The
+        operand is a literal, or a prefix operator applied to the chain of
+        operations binding tighter than it. Then, as long as the next token is
+        an operator binding tighter than the power, it is consumed, and its
+        right member is the chain of operations binding tighter than that
+        operator. Otherwise, the token is left to the caller and the current
+        node is returned.
+
+        The binding powers are looked up in a table, so that an operand is
+        parsed by a single call, however many levels of precedence there are.
+
+        If the left member of a whole expression is an end of line or an end of
+        file, then it means that we are starting with an empty line, and in
+        this case, a Noop node is being returned.
+        """
+        return self._run(self._operation(power))
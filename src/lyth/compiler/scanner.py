@@ -3,10 +3,56 @@ This module contains the text scanner.
 
 The Scanner is a generator over a string, reading characters one by one so that
 the Lexer can build tokens from it.
+
+The source can also be given as bytes, a bytearray or a memoryview, or a file
+can be mapped in memory rather than read. In that case, the scanner runs over
+the buffer itself, and only decodes the characters that are not ASCII, and the
+lines that need to be displayed.
+
+The source is held as a list of chunks, so that appending data to a scanner
+does not copy what it already holds. Last but not least, the StreamScanner
+reads its source by chunks from a file object, and only keeps in memory the
+last few lines being scanned.
+
+Rather than characters, the scanner can also hand out spans, that is the
+longest runs of characters of a same class: letters, digits or spaces. Other
+characters are handed out one by one.
+
+The state of the scanner is held by the instance itself, not by a generator, so
+that a checkpoint can be taken at any time, and the scanner reset to it.
+
+Strings are normalised as they are given to the scanner: carriage returns are
+removed and tabulations are expanded to two spaces, once for the whole chunk.
+Columns are nevertheless reported in the original text, a tabulation counting
+as a single column.
+
+Finally, the source can be edited in place, at offsets in the original text.
+The buffer and the table of line starts are patched, and the range of lines to
+lex again is reported.
 """
 from __future__ import annotations
 
+import codecs
+import mmap
+import os
+import re
+from bisect import bisect_left
+from bisect import bisect_right
+from typing import IO
+from typing import Dict
 from typing import Generator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+from lyth.compiler.identifier import IdentifierTable
+from lyth.compiler.source import sources
+
+_SPANS = re.compile(r"[^\W\d]+|\d+| +|\n|.")
+_BYTE_SPANS = re.compile(rb"[A-Za-z_]+|[0-9]+|[ \t]+|\n|\r+|[\x80-\xff]+|.")
+_BYTE_EOL = re.compile(rb"\n")
 
 
 class Scanner:
@@ -18,36 +64,85 @@ class Scanner:
     such as keeping track of lines for debug purposes in case an exception is
     raised.
     """
-    def __init__(self, data: str, filename: str = "<stdin>", lineno: int = 0) -> None:
+    def __init__(self, data: Union[str, bytes, bytearray, memoryview, mmap.mmap], filename: str = "<stdin>",
+                 lineno: int = 0, identifiers: Optional[IdentifierTable] = None) -> None:
         """
         Instantiate the scanner.
 
         The scanner requires a source of characters, ideally an iterable like a
         string, and optionally, a filename if the source has been retrieved
         from there (but it could be an IP address for example, a urn and so on)
+
+        The source is registered in the source manager, which gives it an
+        identifier that tokens carry rather than the filename.
+
+        The source can also be a buffer of UTF-8 encoded bytes, which is then
+        scanned without being copied or decoded upfront. As such, it must not
+        be modified while it is being scanned.
+
+        The identifiers of the source are interned in a table of its own,
+        unless a table is provided, shared with the scanners of other sources
+        of a same compilation unit.
         """
-        self.data: str = data
-        self.filename: str = filename
+        if isinstance(data, memoryview) and data.format != 'B':
+            data = data.cast('B')
+
+        self.source_id: int = sources.register(filename, self)
         self.index: int = 0
         self.lineno: int = lineno
-        self.offset: int = -1
-        self._stream: Generator[str, None, None] = self.next()
+        self.column: int = -1
+        self.doc: bool = False
+        self.identifiers: IdentifierTable = identifiers if identifiers is not None else IdentifierTable()
+        self._resume: Tuple[int, int, int, bool] = (0, lineno, -1, False)
+        self._base: int = lineno
+        self._start: int = 0
+        self._done: bool = False
+        self._chunk: int = 0
+        self._chunks: List[Union[str, bytes, bytearray, memoryview, mmap.mmap]] = []
+        self._offsets: List[int] = []
+        self._lines: List[int] = [0]
+        self._tabs: Dict[int, List[int]] = {}
+        self._crs: Dict[int, List[int]] = {}
+        self._append(data)
+        self.data: Union[str, bytes, bytearray, memoryview, mmap.mmap] = self._chunks[0]
 
     def __add__(self, other: str) -> Scanner:
         """
         Append new string to the source being scanned.
 
-        If the underlying generator is not depleted, return this instance, but
-        with the data augmented. Otherwise, return a new instance of a scanner
+        If the scanner has not reached the end of its source, return this
+        instance, but with the data augmented. Otherwise, return a new instance of a scanner
         with an updated line number.
+
+        The new string is stored as a new chunk, the data already held by the
+        scanner is not copied.
         """
-        if self.data:
-            self.data += other
+        if not self._done:
+            self._append(other if isinstance(self.data, str) else other.encode())
             return self
 
         obj = self.__class__(other, self.filename, self.lineno)
         return obj
 
+    @classmethod
+    def from_path(cls, path: Union[str, os.PathLike], filename: Optional[str] = None, lineno: int = 0,
+                  identifiers: Optional[IdentifierTable] = None) -> Scanner:
+        """
+        Instantiate a scanner over a file mapped in memory.
+
+        The file is neither read nor decoded upfront. The scanner runs over
+        its bytes, expecting them to be UTF-8 encoded, as it would over any
+        other buffer. The filename defaults to the path of the file.
+        """
+        with open(path, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            except ValueError:  # An empty file cannot be mapped.
+                data = b''
+
+        return cls(data, filename or os.fspath(path), lineno, identifiers)
+
     def __call__(self) -> str:
         """
         Retrieve the next character in source code.
@@ -58,7 +153,7 @@ class Scanner:
         If the end of the source code is reached, the StopIteration exception
         is propagated to the lexer.
         """
-        return next(self._stream)
+        return self.read()
 
     def __iter__(self) -> Scanner:
         """
@@ -75,7 +170,327 @@ class Scanner:
         is callable because it has practically only one meaning in life which
         is fetching the next character...
         """
-        return next(self._stream)
+        return self.read()
+
+    def _absolute(self, table: Dict[int, List[int]]) -> List[int]:
+        """
+        The absolute positions of the tabulations, or of the carriage returns,
+        of a table, in order.
+        """
+        return [self._lines[lineno - self._base] + column for lineno in sorted(table) for column in table[lineno]]
+
+    def _append(self, chunk: Union[str, bytes, bytearray, memoryview, mmap.mmap]) -> None:
+        """
+        Append a chunk to the source, and record the lines it contains.
+
+        A string is normalised first: carriage returns are removed, and
+        tabulations are expanded to two spaces. Where tabulations and carriage
+        returns were is recorded, line by line, so that columns can be reported
+        in the original text, and offsets in the original text mapped back.
+        """
+        start = self._offsets[-1] + len(self._chunks[-1]) if self._chunks else 0
+        chunk, tabs, crs = self._normalise(chunk, start)
+
+        self._chunks.append(chunk)
+        self._offsets.append(start)
+        self._lines.extend(self._find_lines(chunk, start))
+        self._record(self._tabs, tabs)
+        self._record(self._crs, crs)
+
+    def _normalise(self, chunk: Union[str, bytes, bytearray, memoryview, mmap.mmap],
+                   start: int) -> Tuple[Union[str, bytes, bytearray, memoryview, mmap.mmap], List[int], List[int]]:
+        """
+        Normalise a chunk of the source.
+
+        Carriage returns are removed from strings, and tabulations expanded to
+        two spaces. The absolute positions of the tabulations, once expanded,
+        and of the characters that followed carriage returns, are returned with
+        the chunk. Bytes are returned as they are.
+        """
+        tabs = []
+        crs = []
+
+        if isinstance(chunk, str):
+            if '\r' in chunk:
+                index = chunk.find('\r')
+                while index >= 0:
+                    crs.append(index - len(crs))
+                    index = chunk.find('\r', index + 1)
+
+                chunk = chunk.replace('\r', '')
+
+            if '\t' in chunk:
+                index = chunk.find('\t')
+                while index >= 0:
+                    tabs.append(index)
+                    index = chunk.find('\t', index + 1)
+
+                chunk = chunk.replace('\t', '  ')
+                crs = [cr + bisect_left(tabs, cr) for cr in crs]
+                tabs = [tab + i for i, tab in enumerate(tabs)]
+
+        return chunk, [start + tab for tab in tabs], [start + cr for cr in crs]
+
+    def _record(self, table: Dict[int, List[int]], positions: List[int]) -> None:
+        """
+        Record the columns of tabulations, or of carriage returns, line by
+        line, from their absolute positions.
+        """
+        for position in positions:
+            row = bisect_right(self._lines, position) - 1
+            table.setdefault(self._base + row, []).append(position - self._lines[row])
+
+    def _fetch(self) -> bool:
+        """
+        Fetch more data once the end of the source has been reached.
+
+        A scanner over a string or a file mapped in memory already has its
+        whole source at hand, and has nothing more to fetch.
+        """
+        return False
+
+    def _find_lines(self, chunk: Union[str, bytes, bytearray, memoryview, mmap.mmap], start: int) -> List[int]:
+        """
+        Find where lines begin in a chunk of the source.
+
+        The table of line starts is built once per source, and only extended
+        when more data is appended to the scanner, so that retrieving the text
+        of a line never requires to look for feed line characters again.
+
+        Positions are absolute, start being the position of the chunk in the
+        source.
+        """
+        if not isinstance(chunk, str):
+            return [start + match.end() for match in _BYTE_EOL.finditer(chunk)]
+
+        lines = []
+        find = chunk.find
+        index = find('\n')
+
+        while index >= 0:
+            lines.append(start + index + 1)
+            index = find('\n', index + 1)
+
+        return lines
+
+    def _more(self) -> bool:
+        """
+        Move on to the next chunk once the current one has been scanned.
+        """
+        if self._chunk + 1 == len(self._chunks) and not self._fetch():
+            return False
+
+        self._chunk += 1
+        self.data = self._chunks[self._chunk]
+        self._start = self._offsets[self._chunk]
+        return True
+
+    def _position(self, offset: int) -> Tuple[int, int]:
+        """
+        The absolute index of an offset in the original text, and the number
+        of carriage returns removed before that index which precede the
+        offset.
+
+        The tabulations and the carriage returns of the source are walked
+        through in order, shifting the offset by each one before it. Several
+        carriage returns in a row are removed before a same index, the number
+        of them preceding the offset tells where in the row the offset is.
+        """
+        if not self._tabs and not self._crs:
+            return offset, 0
+
+        events = sorted([(tab, 1) for tab in self._absolute(self._tabs)] + [(cr, -1) for cr in self._absolute(self._crs)])
+        shift = 0
+        run, last = 0, -1
+
+        for index, step in events:
+            if offset < index - shift or offset == index - shift and step > 0:
+                break
+
+            if step < 0:
+                if index != last:
+                    run, last = 0, index
+
+                if offset == index - shift:
+                    return index, run
+
+                run += 1
+
+            shift += step
+
+        index = offset + shift
+        return index, run if index == last else 0
+
+    def apply_edit(self, start: int, end: int, text: str) -> Tuple[int, int]:
+        """
+        Replace the source between two offsets with a new text.
+
+        Offsets are in the original text, as an editor knows them, the end
+        being excluded. They are mapped to absolute positions in the source as
+        the scanner holds it, once carriage returns are removed and tabulations
+        expanded, as position does. The text is normalised as any other chunk.
+        The chunks holding the edited text are split around it, so that the
+        rest of the source is not copied, and the table of line starts is patched rather
+        than built again: the lines before the edit are kept, the lines
+        within are found in the new text, and the lines after are shifted.
+
+        The range of lines whose tokens may have changed is returned, both
+        ends included, in the numbering of the source once edited. It spans
+        the lines the edit touches, plus the next one if the edit leaves or
+        used to leave a line of a single character, as the lexer would then
+        start an indent on the following line. It begins with the line opening
+        the docstring the edit falls in, if any, as a docstring is a single
+        token. Should the edit open or close a docstring, every line up to the
+        end of the source is reported.
+
+        Eventually, the scanner is moved to the beginning of the first line of
+        the range, so that a new lexer can scan it again from there.
+
+        Raises:
+            ValueError: The offsets are not part of the source held by the
+                        scanner.
+        """
+        lines = self._lines
+        offsets = self._offsets
+        chunks = self._chunks
+        size = offsets[-1] + len(chunks[-1])
+        start, kept = self._position(start)
+        end, dropped = self._position(end)
+
+        if not lines[0] <= start <= end <= size:
+            raise ValueError("The edit is not part of the source being scanned")
+
+        first = bisect_right(lines, start) - 1
+        last = bisect_right(lines, end) - 1
+        before = self.text(lines[first], lines[last + 1] - 1 if last + 1 < len(lines) else size)
+
+        if isinstance(chunks[0], str):
+            text, tabs, crs = self._normalise(text, start)
+
+        else:
+            text, tabs, crs = text.encode(), [], []
+
+        delta = len(text) - (end - start)
+
+        # 1. The chunks holding the edited text are replaced with the text
+        #    before the edit, the new text, and the text after the edit.
+        head = max(bisect_right(offsets, start) - 1, 0)
+        tail = max(bisect_left(offsets, end) - 1, head)
+        pieces = [chunks[head][:start - offsets[head]], text, chunks[tail][end - offsets[tail]:]]
+        pieces = [piece for piece in pieces if len(piece)] or [text]
+        position = offsets[head]
+
+        chunks[head: tail + 1] = pieces
+        offsets[head: tail + 1] = [position + sum(len(piece) for piece in pieces[:i]) for i in range(len(pieces))]
+
+        for i in range(head + len(pieces), len(offsets)):
+            offsets[i] += delta
+
+        # 2. Tabulations and carriage returns of the edited lines are kept
+        #    along with the new ones, should they be out of the edit, and moved
+        #    with the text after it. The carriage returns removed before the
+        #    first or the last character of the edit are told apart by their
+        #    rank in their row.
+        for row in range(first, last + 1):
+            for column in self._tabs.pop(self._base + row, ()):
+                tab = lines[row] + column
+                if tab < start:
+                    tabs.append(tab)
+
+                elif tab >= end:
+                    tabs.append(tab + delta)
+
+            rank, previous = 0, -1
+            for column in self._crs.pop(self._base + row, ()):
+                cr = lines[row] + column
+                rank = rank + 1 if cr == previous else 0
+                previous = cr
+
+                if cr < start or cr == start and rank < kept:
+                    crs.append(cr)
+
+                elif cr > end or cr == end and rank >= dropped:
+                    crs.append(cr + delta)
+
+        # 3. The table of line starts is patched, and the tabulations and
+        #    carriage returns of the following lines renumbered.
+        found = self._find_lines(text, start)
+        shift = len(found) - (last - first)
+        lines[first + 1:] = found + [position + delta for position in lines[last + 1:]]
+
+        if shift:
+            self._tabs = {lineno + shift if lineno > self._base + last else lineno: columns
+                          for lineno, columns in self._tabs.items()}
+            self._crs = {lineno + shift if lineno > self._base + last else lineno: columns
+                         for lineno, columns in self._crs.items()}
+
+        self._record(self._tabs, sorted(tabs))
+        self._record(self._crs, sorted(crs))
+
+        # 4. The range of lines whose tokens may have changed begins with the
+        #    first line of the edit. A token may run from a blank line, or a
+        #    line of a single character, into the next one, so that the range
+        #    is extended back over them. A docstring being a single token, the
+        #    range begins with the line opening the docstring the edit falls
+        #    in, if any.
+        row = first + len(found)
+        after = self.text(lines[first], lines[row + 1] - 1 if row + 1 < len(lines) else size + delta)
+        lineno = self._base + first
+
+        while True:
+            while lineno > self._base and self.spills(lineno - 1):
+                lineno -= 1
+
+            head = self.text(lines[0], lines[lineno - self._base])
+
+            if head.count('"""') % 2 == 0:
+                break
+
+            lineno = self._base + head.count('\n', 0, head.rfind('"""'))
+
+        # 5. The range ends with the line before the first unchanged line the
+        #    lexer enters as it used to, that is with as many docstrings open,
+        #    and after a line which spills neither before nor after the edit.
+        #    The lines following the edit are unchanged, so that only the last
+        #    line of the edit may have spilled otherwise. Should the edit open
+        #    or close a docstring, no line is entered as it used to.
+        dirty = self._base + row
+        final = self._base + len(lines) - 1
+        spilled = self.spills(before.rsplit('\n', 1)[-1])
+
+        if before.count('"""') % 2 != after.count('"""') % 2:
+            dirty = final
+
+        while dirty < final and (spilled or self.spills(dirty)):
+            dirty += 1
+            spilled = False
+
+        self.seek(lineno)
+        return lineno, dirty
+
+    def chunks(self) -> Generator[Union[str, bytes, bytearray, memoryview, mmap.mmap], None, None]:
+        """
+        The source held by the scanner, chunk by chunk, as it holds it: strings
+        once normalised, or buffers of bytes as they were given.
+        """
+        yield from self._chunks
+
+    @property
+    def filename(self) -> str:
+        """
+        The filename of the source being scanned.
+
+        The scanner registers its source when it is instantiated, and only
+        keeps its identifier. The filename is looked up in the registry.
+        """
+        return sources.filename(self.source_id)
+
+    def is_whole_source(self) -> bool:
+        """
+        Whether the scanner holds the whole of its source, rather than fetching
+        it as it is scanned.
+        """
+        return True
 
     @property
     def line(self) -> str:
@@ -83,65 +498,543 @@ class Scanner:
         The current line being scanned.
 
         This is a convenient property to let the user access the current line
-        being parsed. The property looks for enclosing feed line characters,
-        before and after the character being scanned. If the character does not
-        exist before, it starts from the begining of the source being scanned,
-        if it does not exist after, it goes all through the source until its
-        end.
+        being parsed. It is looked up in the table of line starts, using the
+        current line number.
+        """
+        return self.line_at(self.lineno)
+
+    def line_at(self, lineno: int) -> str:
+        """
+        The text of the line provided as argument.
+
+        The line number is the one reported by the scanner, and as such it may
+        not begin at 0 if this scanner was respawned. An empty string is
+        returned for lines that are not part of the source being scanned.
+        """
+        row = lineno - self._base
+
+        if row < 0 or row >= len(self._lines):
+            return ''
+
+        begin = self._lines[row]
+        end = self._lines[row + 1] - 1 if row + 1 < len(self._lines) else self._offsets[-1] + len(self._chunks[-1])
+        return self.text(begin, end)
+
+    def line_start(self, lineno: int) -> int:
+        """
+        The absolute index of the beginning of a line.
+
+        Raises:
+            ValueError: The scanner does not hold this line.
+        """
+        row = lineno - self._base
+
+        if row < 0 or row >= len(self._lines):
+            raise ValueError("The scanner does not hold this line")
+
+        return self._lines[row]
+
+    def locate(self, index: int) -> Tuple[int, int]:
+        """
+        The line number and the column in the original text of the character
+        at an absolute index, as the scanner reports them once it has read it.
+
+        The line is found in the table of line starts. (-1, -1) is returned for
+        characters out of the lines the scanner keeps.
+        """
+        row = bisect_right(self._lines, index) - 1
+
+        if index < 0 or row < 0:
+            return -1, -1
+
+        lineno = self._base + row
+        column = index - self._lines[row]
+        tabs = self._tabs.get(lineno)
+        return lineno, column - bisect_left(tabs, column) if tabs else column
+
+    @property
+    def offset(self) -> int:
+        """
+        The column of the character being scanned in the original text.
+
+        The scanner keeps track of the column in the normalised text. Should
+        the line hold tabulations, the column is mapped back to the original
+        text, where each tabulation is a single column.
+        """
+        tabs = self._tabs.get(self.lineno)
+        return self.column - bisect_left(tabs, self.column) if tabs else self.column
+
+    def mark(self) -> Tuple:
         """
-        begin = self.data.rfind('\n', 0, self.index - 1)
-        end = self.data.find('\n', self.index - 1)
-        data = self.data[begin + 1: end] if end >= 0 else self.data[begin + 1:]
-        return data.replace('\r', '').replace('\t', '  ')
+        Take a checkpoint of the scanner.
 
-    def next(self) -> str:
+        The checkpoint is made of the position being scanned, the position the
+        scanner resumes from, and whether a docstring is open. It is cheap to
+        take, and the scanner can be reset to it at any time without reading
+        the source again. Its content is not meant to be used otherwise.
+        """
+        return self.index, self.lineno, self.column, self._resume, self._start, self.doc
+
+    def next(self) -> Generator[str, None, None]:
+        """
+        A generator over the characters of the source.
+
+        This is a convenience for those who prefer to iterate over characters.
+        Characters are read by read, and the generator stops after the last
+        one.
+        """
+        while True:
+            try:
+                yield self.read()
+
+            except StopIteration:
+                return
+
+    def position(self, offset: int) -> int:
+        """
+        The absolute index, as the scanner holds the source, of an offset in
+        the original text.
+
+        Carriage returns having been removed, and tabulations expanded, the
+        offset is shifted by the tabulations and the carriage returns before
+        it. The offset of a carriage return is mapped to the character
+        following it. Bytes are held as they are, so that an offset in a buffer
+        is its index already.
+        """
+        return self._position(offset)[0]
+
+    def read(self) -> str:
         """
         Shift the scanner to its right, returns the char being read.
 
-        This is a generator yielding a string, character by character. It may
-        eventually ignore characters, such as carriage return, or convert
-        tabulations automatically.
+        Strings having been normalised, there are no carriage returns or
+        tabulations to take care of. Bytes are not, so carriage returns are
+        ignored, and tabulations converted into two spaces, as they are read.
+        ASCII bytes are converted one by one, which does not allocate anything
+        as Python keeps a single instance of each of them. Other characters are
+        decoded from the bytes they are encoded in, and still count as a
+        single column.
 
         When a feed line character is detected, the offset is updated after
-        yielding the character, and it is not incremented before, thus, it must
+        reading the character, and it is not incremented before, thus, it must
         show that the scanner is still looking at the previous character. This
         helps determine empty lines.
 
-        When the end of the file is reached, next simply leaves, causing the
-        generator to raise StopIteration in its lexer parent instance. It also
-        flushes the source being scanned to void further scan on that source.
+        When the end of the file is reached, the scanner marks the source as
+        depleted to void further scan on that source. The source itself is
+        kept, as tokens may still need to read their line.
 
         Raises:
             StopIteration: After the last character of the source has been
-                           read, upon IndexError.
+                           read.
         """
+        index, lineno, column, half = self._resume
+
+        if half:  # The second space of a tabulation.
+            self._resume = (index, lineno, column, False)
+            return ' '
+
+        data = self.data
+
         while True:
-            try:
-                char = self.data[self.index]
-                self.index += 1
+            position = index - self._start
 
-                if char == '\r':
+            if position >= len(data):
+                if self._more():
+                    data = self.data
                     continue
 
-                elif char == '\n':
-                    yield char
-                    self.lineno += 1
-                    self.offset = -1
+                self.index, self.lineno, self.column = index, lineno, column
+                self._done = True
+                raise StopIteration
+
+            char = data[position]
+            index += 1
+
+            if isinstance(char, str):
+                break
+
+            elif char == 0x0D:
+                continue
+
+            elif char == 0x0A:
+                char = '\n'
+
+            elif char == 0x09:
+                char = ' '
+                half = True
+
+            elif char < 0x80:
+                char = chr(char)
+
+            else:
+                width = 2 if char < 0xE0 else 3 if char < 0xF0 else 4
+                try:
+                    char = str(data[position: position + width], 'utf-8')
+                    index += width - 1
+
+                except UnicodeDecodeError:
+                    char = '\ufffd'
+
+            break
+
+        if char == '\n':
+            self.index, self.lineno, self.column = index, lineno, column
+            self._resume = (index, lineno + 1, -1, False)
+
+        else:
+            self.index, self.lineno, self.column = index, lineno, column + 1
+            self._resume = (index, lineno, column + 1, half)
+
+        return char
+
+    def read_line(self) -> str:
+        """
+        Shift the scanner to the end of the line, returns the rest of the line.
+
+        The feed line character ending the line is part of the text returned,
+        unless the line is the last one of the source and has none. Strings
+        are returned as they are held, bytes are decoded and normalised the
+        way read does.
+
+        Once the line has been read, the scanner is in the state it would be
+        in, had the line been read character by character.
+
+        Raises:
+            StopIteration: After the last line of the source has been read.
+        """
+        index, lineno, column, half = self._resume
+        data = self.data
+        pieces = []
+
+        while True:
+            position = index - self._start
+            text = isinstance(data, str)
+
+            if text:
+                end = data.find('\n', position)
+
+            else:  # A memoryview has no find.
+                match = _BYTE_EOL.search(data, position)
+                end = match.start() if match is not None else -1
+
+            if end >= 0:
+                pieces.append(data[position: end + 1])
+                index = self._start + end + 1
+                break
+
+            if position < len(data):
+                pieces.append(data[position:])
+                index = self._start + len(data)
+
+            if not self._more():
+                break
+
+            data = self.data
+
+        if text:
+            line = ''.join(pieces)
+            width = len(line)
+
+        else:  # Columns are counted as read_span does, before tabulations are expanded.
+            line = str(b''.join(pieces), 'utf-8', 'replace').replace('\r', '')
+            width = len(line)
+            line = line.replace('\t', '  ')
+
+        if half:  # The second space of a tabulation.
+            line = ' ' + line
+            width += 1
+
+        if not line:
+            self.index, self.lineno, self.column = index, lineno, column
+            self._resume = (index, lineno, column, False)
+            self._done = True
+            raise StopIteration
+
+        if line[-1] == '\n':
+            self.index, self.lineno, self.column = index, lineno, column + width - 1
+            self._resume = (index, lineno + 1, -1, False)
+
+        else:
+            self.index, self.lineno, self.column = index, lineno, column + 1
+            self._resume = (index, lineno, column + width, False)
+
+        return line
+
+    def read_span(self) -> str:
+        """
+        Shift the scanner to its right by a span, returns the span being read.
+
+        A span is the longest run of letters (including '_'), of digits, or of
+        spaces, as a slice of the source. Any other character is a span on its
+        own. Strings being normalised, spans are found in them without looking
+        for carriage returns or tabulations. Bytes are not, so carriage returns
+        are ignored, and tabulations are converted into two spaces, as read
+        does.
+
+        While a span is being handed out, the scanner is positioned on its
+        first character, so that a token created from it captures the right
+        position. Once the next span is read, the scanner resumes from the
+        last character of the span, as if it had been read character by
+        character.
+
+        Raises:
+            StopIteration: After the last span of the source has been read.
+        """
+        index, lineno, column, _ = self._resume
+        data = self.data
+
+        while True:
+            text = isinstance(data, str)
+            match = (_SPANS if text else _BYTE_SPANS).match(data, index - self._start)
+
+            if match is None:
+                if self._more():
+                    data = self.data
+                    continue
+
+                self.index, self.lineno, self.column = index, lineno, column
+                self._done = True
+                raise StopIteration
+
+            span = match.group()
+            width = len(span)
+
+            if not text:
+                span = str(span, 'utf-8', 'replace')
+                width = len(span)
+
+                if span[0] == '\r':
+                    index = self._start + match.end()
                     continue
 
-                elif char == '\t':
-                    self.offset += 1
-                    yield ' '
-                    yield ' '
+                elif span[0] == '\t' or span[0] == ' ':
+                    span = span.replace('\t', '  ')
+
+            break
+
+        end = self._start + match.end()
+
+        if span == '\n':
+            self.index, self.lineno, self.column = end, lineno, column
+            self._resume = (end, lineno + 1, -1, False)
+
+        else:
+            self.index, self.lineno, self.column = self._start + match.start() + 1, lineno, column + 1
+            self._resume = (end, lineno, column + width, False)
+
+        return span
+
+    def read_until(self, needle: str) -> Tuple[str, bool]:
+        """
+        Shift the scanner to the end of the next occurrence of a needle, returns
+        the text read before it, and whether the needle was found.
+
+        The needle must not hold a feed line character. Within the chunk being
+        scanned, a string is searched with a single find, and the position of
+        the needle is found in the table of line starts. Otherwise, the source
+        is read line by line, up to the line holding the needle, and then
+        character by character, up to the end of the needle. If the source has
+        no such needle, the rest of the source is read.
+
+        Once the text has been read, the scanner is in the state it would be
+        in, had it been read character by character.
+        """
+        index, lineno, column, half = self._resume
+        data = self.data
+
+        if isinstance(data, str) and not half:
+            position = index - self._start
+            end = data.find(needle, position)
 
-                else:
-                    self.offset += 1
-                    yield char
+            if end >= 0:
+                last = self._start + end + len(needle) - 1
+                row = bisect_right(self._lines, last) - 1
+                lineno, column = self._base + row, last - self._lines[row]
+                self.index, self.lineno, self.column = last + 1, lineno, column
+                self._resume = (last + 1, lineno, column, False)
+                return data[position:end], True
 
-            except IndexError:
-                self.data = ""
+        pieces = []
+
+        while True:
+            mark = self.mark()
+
+            try:
+                line = self.read_line()
+
+            except StopIteration:
+                return ''.join(pieces), False
+
+            end = line.find(needle)
+
+            if end >= 0:
                 break
 
+            pieces.append(line)
+
+        self.reset(mark)
+
+        for _ in range(end + len(needle)):
+            self.read()
+
+        pieces.append(line[:end])
+        return ''.join(pieces), True
+
+    def reset(self, mark: Tuple) -> None:
+        """
+        Set the scanner back, or forth, to a checkpoint taken by mark.
+
+        Raises:
+            ValueError: The scanner does not hold the data the checkpoint was
+                        taken on anymore.
+        """
+        self.index, self.lineno, self.column, self._resume, start, self.doc = mark
+
+        if start != self._start:
+            chunk = bisect_right(self._offsets, start) - 1
+
+            if chunk < 0 or self._offsets[chunk] != start:
+                raise ValueError("The scanner does not hold the data of this checkpoint anymore")
+
+            self._chunk = chunk
+            self.data = self._chunks[chunk]
+            self._start = start
+
+        self._done = False
+
+    @property
+    def resume(self) -> Tuple[int, int, int, bool]:
+        """
+        Where the scanner resumes from.
+
+        This is the absolute index of the next character to read, the line
+        number and the column of the last character read, and whether the
+        second space of a tabulation is yet to be read. It changes whenever the
+        scanner moves, even if it is moved back to the same position.
+        """
+        return self._resume
+
+    def seek(self, lineno: int) -> None:
+        """
+        Move the scanner to the beginning of a line.
+
+        The scanner resumes as if it had just read the feed line character
+        ending the previous line. Whether a docstring is open there is found
+        by counting the triple quotes before the line, in the source held by
+        the scanner.
+
+        Raises:
+            ValueError: The scanner does not hold this line.
+        """
+        row = lineno - self._base
+
+        if row < 0 or row >= len(self._lines):
+            raise ValueError("The scanner does not hold this line")
+
+        index = self._lines[row]
+        chunk = max(bisect_right(self._offsets, index) - 1, 0)
+
+        self.index, self.lineno, self.column = index, lineno, -1
+        self._resume = (index, lineno, -1, False)
+        self._chunk = chunk
+        self.data = self._chunks[chunk]
+        self._start = self._offsets[chunk]
+        self.doc = self.text(self._lines[0], index).count('"""') % 2 == 1
+        self._done = False
+
+    def seek_index(self, index: int) -> None:
+        """
+        Move the scanner to an absolute index in the source.
+
+        The scanner resumes as if it had just read the character before the
+        index. Whether a docstring is open is left as it is.
+
+        Raises:
+            ValueError: The scanner does not hold this index.
+        """
+        row = bisect_right(self._lines, index) - 1
+        size = self._offsets[-1] + len(self._chunks[-1])
+
+        if row < 0 or index > size:
+            raise ValueError("The scanner does not hold this index")
+
+        lineno, column = self._base + row, index - 1 - self._lines[row]
+        chunk = max(bisect_right(self._offsets, index) - 1, 0)
+
+        self.index, self.lineno, self.column = index, lineno, column
+        self._resume = (index, lineno, column, False)
+        self._chunk = chunk
+        self.data = self._chunks[chunk]
+        self._start = self._offsets[chunk]
+        self._done = False
+
+    def spans(self) -> Generator[str, None, None]:
+        """
+        A generator over the spans of the source.
+
+        This is a convenience for those who prefer to iterate over spans.
+        Spans are read by read_span, and the generator stops after the last
+        one.
+        """
+        while True:
+            try:
+                yield self.read_span()
+
+            except StopIteration:
+                return
+
+    def spills(self, line: Union[int, str]) -> bool:
+        """
+        Whether a token may run from the end of a line into the next one.
+
+        The lexer carries on an indent over blank lines, and starts one from
+        the feed line character of a line of a single character.
+        """
+        if isinstance(line, int):
+            line = self.line_at(line)
+
+        return len(line) < 2 or line.isspace()
+
+    def tab_positions(self) -> List[int]:
+        """
+        The absolute positions of the tabulations of the source, in order, once
+        they are expanded.
+        """
+        return self._absolute(self._tabs)
+
+    def tabs(self, lineno: int) -> Sequence[int]:
+        """
+        The columns of the tabulations of a line, once they are expanded, the
+        first of their two spaces that is.
+        """
+        return self._tabs.get(lineno, ())
+
+    def text(self, begin: int, end: int) -> str:
+        """
+        The text of the source between two absolute positions.
+
+        The chunk holding the begining of the text is found by bisection, and
+        the text is gathered from it and the following chunks, if needed.
+        """
+        chunks = self._chunks
+        offsets = self._offsets
+        pieces = []
+        i = max(bisect_right(offsets, begin) - 1, 0)
+
+        while i < len(chunks) and offsets[i] < end:
+            pieces.append(chunks[i][max(begin - offsets[i], 0): end - offsets[i]])
+            i += 1
+
+        if not pieces:
+            return ''
+
+        if isinstance(pieces[0], str):
+            return pieces[0] if len(pieces) == 1 else ''.join(pieces)
+
+        data = pieces[0] if len(pieces) == 1 else b''.join(pieces)
+        return str(data, 'utf-8', 'replace').replace('\r', '').replace('\t', '  ')
+
     def __repr__(self) -> str:
         """
         Returns the character being scanned in the corresponding line or source
@@ -154,3 +1047,92 @@ class Scanner:
         Returns the current position of the character being scanned.
         """
         return f"in line {self.lineno} column {self.offset}"
+
+
+class StreamScanner(Scanner):
+    """
+    A scanner reading its source from a file object.
+
+    The source is pulled by chunks of fixed size from any text or binary
+    stream, binary streams being expected to be UTF-8 encoded. Only a sliding
+    window over the source is held in memory: the line being scanned, and a
+    few lines before it, so that the line of recent tokens is still available
+    if an error has to be reported.
+    """
+    def __init__(self, stream: IO, filename: str = "<stream>", lineno: int = 0,
+                 chunk_size: int = 65536, history: int = 8, identifiers: Optional[IdentifierTable] = None) -> None:
+        """
+        Instantiate the scanner.
+
+        Arguments:
+            stream:      The file object to read the source from.
+            filename:    The name to report in errors.
+            lineno:      The number of the first line in the stream.
+            chunk_size:  The number of characters, or bytes, read at once.
+            history:     The number of lines kept before the line being
+                         scanned.
+            identifiers: The table of identifiers to intern names in, if it
+                         is shared with other sources.
+        """
+        self.stream: IO = stream
+        self.chunk_size: int = chunk_size
+        self.history: int = history
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        super().__init__('', filename, lineno, identifiers)
+
+    def _fetch(self) -> bool:
+        """
+        Read the next chunk from the stream, and slide the window over it.
+
+        The chunks only holding lines that precede the line being scanned by
+        more than the history are dropped once the new chunk is appended.
+        """
+        chunk = self.stream.read(self.chunk_size)
+
+        while not isinstance(chunk, str):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+            raw = chunk
+            chunk = self._decoder.decode(raw, final=not raw)
+
+            if raw and not chunk:  # A character is split between two chunks.
+                chunk = self.stream.read(self.chunk_size)
+
+        if not chunk:
+            return False
+
+        self._append(chunk)
+
+        row = max(self.lineno - self._base - self.history, 0)
+        drop = min(bisect_right(self._offsets, self._lines[row]) - 1, self._chunk)
+
+        del self._chunks[:drop]
+        del self._offsets[:drop]
+        del self._lines[:row]
+        self._chunk -= drop
+        self._base += row
+
+        for table in (self._tabs, self._crs):
+            for lineno in [lineno for lineno in table if lineno < self._base]:
+                del table[lineno]
+
+        return True
+
+    def is_whole_source(self) -> bool:
+        """
+        A stream scanner only holds a window over its source.
+        """
+        return False
+
+    def line_at(self, lineno: int) -> str:
+        """
+        The text of the line provided as argument.
+
+        If the line is the last one in the window, it may not have been read
+        entirely yet, in which case the stream is read up to its end.
+        """
+        while lineno - self._base == len(self._lines) - 1 and self._fetch():
+            pass
+
+        return super().line_at(lineno)
@@ -0,0 +1,120 @@
+"""
+This module contains the registry of sources being compiled.
+
+Tokens and nodes are created by the millions, and each of them keeps track of
+the source it was read from. Rather than a reference to the filename and to
+the scanner, they hold a small integer identifying the source in a registry,
+and only resolve the filename, or the text of a line, when it is needed, that
+is when an error is reported. This also makes them cheap to pickle, when they
+are sent to another process.
+"""
+from __future__ import annotations
+
+import weakref
+from typing import TYPE_CHECKING
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+if TYPE_CHECKING:
+    from lyth.compiler.scanner import Scanner
+
+
+class SourceManager:
+    """
+    The registry of sources, mapping an identifier to a filename and a text.
+
+    Identifiers are given in sequence, starting from 0, and are never given
+    twice. The text of a source is held by the scanner reading it, which the
+    registry only refers to weakly: the text is forgotten once the scanner is
+    released, or once nothing else holds the scanner, a file mapped in memory
+    being unmapped then. A source is removed from the registry when it is
+    released, so that the registry does not grow with every scanner ever
+    created, each input of an interactive session being a scanner of its own.
+
+    Sources registered without a scanner only have a filename, and a same
+    filename is then given a same identifier. They are shared by all the
+    tokens and nodes created by hand with that filename, and are kept.
+    """
+    def __init__(self) -> None:
+        """
+        Instantiate an empty registry.
+        """
+        self._sources: Dict[int, Tuple[str, Optional[weakref.ref]]] = {}
+        self._names: Dict[str, int] = {}
+        self._next: int = 0
+
+    def __len__(self) -> int:
+        """
+        The number of sources in the registry, released sources excepted.
+        """
+        return len(self._sources)
+
+    def filename(self, source_id: int) -> str:
+        """
+        The filename of a source.
+
+        Sources released, or registered in another process, are unknown to
+        this registry, in which case a placeholder is returned.
+        """
+        entry = self._sources.get(source_id)
+        return entry[0] if entry is not None else "<unknown>"
+
+    def line(self, source_id: int, lineno: int) -> str:
+        """
+        The text of a line of a source.
+
+        An empty string is returned if the source is unknown, has been
+        released, or its scanner has been freed.
+        """
+        scanner = self.scanner(source_id)
+        return scanner.line_at(lineno) if scanner is not None else ''
+
+    def register(self, filename: str, scanner: Optional[Scanner] = None) -> int:
+        """
+        Register a source, and return its identifier.
+
+        A source registered without a scanner is only a filename. It is given
+        the same identifier as the previous registration of that filename, if
+        any, so that tokens and nodes created by hand do not fill the registry.
+        """
+        if scanner is None and filename in self._names:
+            return self._names[filename]
+
+        source_id = self._next
+        self._next += 1
+        self._sources[source_id] = (filename, weakref.ref(scanner) if scanner is not None else None)
+
+        if scanner is None:
+            self._names[filename] = source_id
+
+        return source_id
+
+    def release(self, source_id: int) -> None:
+        """
+        Forget a source, once it has been compiled.
+
+        The source is removed from the registry, its filename being unknown
+        and its lines empty from then on, so that errors meant to be reported
+        should be raised before. Sources registered without a scanner are
+        shared, and are not released.
+        """
+        entry = self._sources.get(source_id)
+
+        if entry is not None and entry[1] is not None:
+            del self._sources[source_id]
+
+    def scanner(self, source_id: int) -> Optional[Scanner]:
+        """
+        The scanner holding the text of a source, if it is still registered,
+        and still alive.
+        """
+        entry = self._sources.get(source_id)
+
+        if entry is not None and entry[1] is not None:
+            return entry[1]()
+
+        return None
+
+
+sources = SourceManager()
@@ -11,6 +11,8 @@ from typing import Optional
 from typing import Tuple
 from typing import Union
 
+from lyth.compiler.identifier import IdentifierTable
+
 
 class Field(Enum):
     """
@@ -73,32 +75,47 @@ class Name:
     """
     A symbol maintained in the table by the analyzer and exposed to the
     interpreter.
+
+    The name and the scope are held as the ids of their identifiers, in the
+    table of identifiers of the source they were met in, so that telling two
+    names of a same source apart compares integers. The tree is still ordered
+    alphabetically, as ids are given in the order identifiers are met, and
+    would turn the tree into a list. Names met in sources which do not share
+    their table, such as modules sharing a scope, are compared by the strings
+    of their identifiers.
     """
     roots = set()
 
-    def __init__(self, name: str, scope: str, type: SymbolType) -> None:
+    def __init__(self, name: Union[int, str], scope: Union[int, str], type: SymbolType,
+                 identifiers: Optional[IdentifierTable] = None) -> None:
         """
         Instantiate a new symbol.
 
         Attributes:
             name:    The name is the identifier of the symbol, it comes from
-                     the Name AST node, and stores the lexeme of the associated
-                     token.
+                     the Name AST node, and stores the id of the lexeme of the
+                     associated token. An identifier is interned.
             type:    The type of the symbol validates its integrity when
                      operations are applied on. For example can we reassign an
                      immutable variable? Can we add up two different types?
             scope:   The scope determines validity of a symbol and helps solve
                      naming conflicts. It is the name of another symbol, and as
                      such the interpreter must be able to find that symbol.
+                     As the name, it is stored as an id.
             address: The address in target memory this symbol will be assigned
                      to.
             size:    The address space required by this symbol in memory based
                      on its type.
             left:    Left child node for this binary tree.
             right:   Right child node for this binary tree.
+
+        The ids are those of the table of identifiers provided, or of a table
+        of its own if none is.
         """
-        self.__name = name
-        self.__scope = scope
+        self.identifiers = identifiers if identifiers is not None else IdentifierTable()
+        self.__name = name if name.__class__ is int else self.identifiers.intern(name)
+        self.__scope = scope if scope.__class__ is int else self.identifiers.intern(scope)
+        self.__key = (self.identifiers[self.__name], self.identifiers[self.__scope])
         self.type = type
         self.address: Union[Field, int] = Field.UNKNOWN
         self.size: Union[Field, int] = Field.UNKNOWN
@@ -149,7 +166,7 @@ class Name:
         else:
             return False
 
-    def __delitem__(self, info: Tuple[str, str]) -> None:
+    def __delitem__(self, info: Tuple[Union[int, str], Union[int, str]]) -> None:
         """
         Delete a node from this symbol table. It can be the root node itself.
 
@@ -157,7 +174,7 @@ class Name:
         node.
         """
         if not isinstance(info, tuple):
-            raise ValueError(f"__delitem__ accepts info as tuple of 'str' (<name, scope>), not {type(info)}")
+            raise ValueError(f"__delitem__ accepts info as tuple of 'str' or 'int' (<name, scope>), not {type(info)}")
 
         node = self[info]  # Can raise an exception.
         for child in node.next(TraversalMode.POST_ORDER):
@@ -179,12 +196,15 @@ class Name:
         Are the two objects equivalent?
 
         To be considered equal, the objects must bare the same name, and the
-        same scope.
+        same scope. Their ids are compared if they come from the same table.
         """
         if not isinstance(other, self.__class__):
             raise ValueError(f"Cannot compare {self.__class__.__name__} with {type(other)}")
 
-        return self.__name == other.__name and self.__scope == other.__scope
+        if self.identifiers is other.identifiers:
+            return self.__name == other.__name and self.__scope == other.__scope
+
+        return self.__key == other.__key
 
     def __ge__(self, other: Name) -> bool:
         """
@@ -193,21 +213,21 @@ class Name:
         if not isinstance(other, self.__class__):
             raise ValueError(f"Cannot compare {self.__class__.__name__} with {type(other)}")
 
-        if self.__name == other.__name:
-            return self.__scope >= other.__scope
-
-        return self.__name > other.__name
+        return self.__key >= other.__key
 
-    def __getitem__(self, info: Union[str, Tuple[str, str]]) -> Union[Name, List[Name]]:
+    def __getitem__(self, info: Union[str, Name, Tuple[Union[int, str], Union[int, str]]]) -> Union[Name, List[Name]]:
         """
         Retrieves an instance of Name based on its information.
 
         If the information is only a name, then it returns all the names in the
         symbol table regardless of their scope. If a scope is provided as well,
         then it returns only
+
+        Ids given in a tuple are those of the table of this instance. A name
+        met in another source is looked up with a Name holding its ids.
         """
-        if isinstance(info, tuple):
-            other = self.__class__(*info, SymbolType())
+        if isinstance(info, (tuple, Name)):
+            other = info if isinstance(info, Name) else self.__class__(*info, SymbolType(), self.identifiers)
             if other == self:
                 return self
 
@@ -224,14 +244,14 @@ class Name:
                 return self.right[info]
 
             else:
-                raise KeyError(f"({''.join(info)}) not in this node ({self})")
+                raise KeyError(f"({other}) not in this node ({self})")
 
         elif isinstance(info, str):
-            return [child for child in self() if child.name == info]
+            return [child for child in self() if child.__key[0] == info]
 
         else:
-            raise ValueError(f"__getitem__ accepts info as name of 'str', or "
-                             f"<name, scope> as tuple of 'str', not {type(info)}")
+            raise ValueError(f"__getitem__ accepts info as name of 'str', a Name, or "
+                             f"<name, scope> as tuple of 'str' or 'int', not {type(info)}")
 
     def __gt__(self, other: Name) -> bool:
         """
@@ -240,16 +260,13 @@ class Name:
         if not isinstance(other, self.__class__):
             raise ValueError(f"Cannot compare {self.__class__.__name__} with {type(other)}")
 
-        if self.__name == other.__name:
-            return self.__scope > other.__scope
-
-        return self.__name > other.__name
+        return self.__key > other.__key
 
     def __hash__(self):
         """
         Return the hash value of the name and the scope of this instance.
         """
-        return hash((self.__name, self.__scope))
+        return hash(self.__key)
 
     def __le__(self, other: Name) -> bool:
         """
@@ -258,10 +275,7 @@ class Name:
         if not isinstance(other, self.__class__):
             raise ValueError(f"Cannot compare {self.__class__.__name__} with {type(other)}")
 
-        if self.__name == other.__name:
-            return self.__scope <= other.__scope
-
-        return self.__name < other.__name
+        return self.__key <= other.__key
 
     def __lt__(self, other: Name) -> bool:
         """
@@ -270,10 +284,7 @@ class Name:
         if not isinstance(other, self.__class__):
             raise ValueError(f"Cannot compare {self.__class__.__name__} with {type(other)}")
 
-        if self.__name == other.__name:
-            return self.__scope < other.__scope
-
-        return self.__name < other.__name
+        return self.__key < other.__key
 
     def __ne__(self, other: Name) -> bool:
         """
@@ -285,7 +296,10 @@ class Name:
         if not isinstance(other, self.__class__):
             raise ValueError(f"Cannot compare {self.__class__.__name__} with {type(other)}")
 
-        return self.__name != other.__name or self.__scope != other.__scope
+        if self.identifiers is other.identifiers:
+            return self.__name != other.__name or self.__scope != other.__scope
+
+        return self.__key != other.__key
 
     def __repr__(self) -> str:
         """
@@ -293,22 +307,22 @@ class Name:
         """
         return f"{self!s}: {self.type!s}"
 
-    def __setitem__(self, info: Tuple[str, str], type_) -> None:
+    def __setitem__(self, info: Tuple[Union[int, str], Union[int, str]], type_) -> None:
         """
         Insert a new node in tree by key rather than by node.
         """
         if not isinstance(info, tuple):
-            raise ValueError(f"__setitem__ accepts info as tuple of 'str' (<name, scope>), not {type(info)}")
+            raise ValueError(f"__setitem__ accepts info as tuple of 'str' or 'int' (<name, scope>), not {type(info)}")
 
-        self += Name(*info, type_)
+        self += Name(*info, type_, self.identifiers)
 
     def __str__(self) -> str:
         """
         Returns the key of this node
         """
-        return f"{self.__name}, {self.__scope}"
+        return f"{self.name}, {self.scope}"
 
-    def get(self, info: Union[str, Tuple[str, str]], default: Any) -> Any:
+    def get(self, info: Union[str, Name, Tuple[Union[int, str], Union[int, str]]], default: Any) -> Any:
         """
         Wrapper that returns a default object or type if a node cannot be
         located within that tree.
@@ -346,6 +360,13 @@ class Name:
         """
         Returns the read only name attribute
         """
+        return self.__key[0]
+
+    @property
+    def name_id(self) -> int:
+        """
+        Returns the id of the read only name attribute
+        """
         return self.__name
 
     def next(self, mode: TraversalMode = TraversalMode.PRE_ORDER) -> Name:
@@ -373,12 +394,13 @@ class Name:
             yield self
 
     @classmethod
-    def root(cls, name: str, scope: str, type: SymbolType) -> Name:
+    def root(cls, name: Union[int, str], scope: Union[int, str], type: SymbolType,
+             identifiers: Optional[IdentifierTable] = None) -> Name:
         """
         Create a new node object and register as root, or return root if it
         exists.
         """
-        obj = cls(name, scope, type)
+        obj = cls(name, scope, type, identifiers)
         for r in cls.roots:
             if r == obj:
                 return r
@@ -391,4 +413,11 @@ class Name:
         """
         Returns the read only scope attribute
         """
+        return self.__key[1]
+
+    @property
+    def scope_id(self) -> int:
+        """
+        Returns the id of the read only scope attribute
+        """
         return self.__scope
@@ -7,17 +7,37 @@ we use here an Enum to describe the types.
 from __future__ import annotations
 
 from enum import Enum
+from typing import Dict
+from typing import FrozenSet
 from typing import Optional
+from typing import Tuple
+from typing import Union
 
 from lyth.compiler.error import LythError
 from lyth.compiler.error import LythSyntaxError
+from lyth.compiler.identifier import IdentifierTable
 from lyth.compiler.scanner import Scanner
+from lyth.compiler.source import sources
+
+
+def _is_word(lexeme: str) -> bool:
+    """
+    Tell whether the lexeme is only made of alphanumerical characters, or '_'.
+    """
+    return lexeme.replace('_', 'a').isalnum()
 
 
 class _Lexeme(Enum):
     """
     A generic enumeration with a couple of helpers to inherit from.
+
+    Once all the enumerations are defined, each member is given a dense
+    integer code, its index in KINDS, so that the lexer can look up what it
+    needs to know about a member in a table rather than through the machinery
+    of the enumerations.
     """
+    code: int  # The index of the member in KINDS, given once KINDS is built.
+
     @classmethod
     def as_value(cls, value: Optional[str]) -> _Lexeme:
         """
@@ -107,16 +127,147 @@ class Literal(_Lexeme):
     VALUE = 'value'            # A numeral value.
 
 
+class Sentinel(_Lexeme):
+    """
+    The enumeration of the kinds of tokens only the compiler creates.
+
+    They are never scanned, and are kept apart from the symbols, so that code
+    iterating over the symbols, or matching on them, does not meet them.
+    """
+    ERROR = '\x00'             # Text skipped by a lexer recovering from an error
+
+
+# Kinds added since buffers were first cached are appended, rather than found
+# in their enumeration, so that the codes of the other kinds do not change.
+KINDS: Tuple[_Lexeme, ...] = (*Symbol, *Keyword, *Literal, *Sentinel)
+
+for _code, _kind in enumerate(KINDS):
+    _kind.code = _code
+
+# The tables used on the hot path of the lexer: lexemes of symbols and
+# keywords, prefixes of symbols that may be extended to a longer symbol, and
+# the enumeration of each kind, by code.
+_SYMBOLS: Dict[Optional[str], Symbol] = {symbol.value: symbol for symbol in Symbol}
+_KEYWORDS: Dict[str, Keyword] = {keyword.value: keyword for keyword in Keyword}
+_PREFIXES: FrozenSet[str] = frozenset(value[:end] for value in _SYMBOLS if value for end in range(1, len(value)))
+_IS_SYMBOL: Tuple[bool, ...] = tuple(kind.__class__ is Symbol for kind in KINDS)
+_IS_KEYWORD: Tuple[bool, ...] = tuple(kind.__class__ is Keyword for kind in KINDS)
+_IS_LITERAL: Tuple[bool, ...] = tuple(kind.__class__ is Literal for kind in KINDS)
+
+
 class TokenInfo:
     """
     A unit of data capturing a snapshot of the scanner metadata when a Token
     object is instantiated.
+
+    Only the position of the token is captured: the identifier of its source,
+    its line number, its column and its absolute index in the source. The
+    filename and the text of the line are looked up in the source manager when
+    they are read, which in practice only happens when an error message is
+    formatted.
+
+    For convenience, a filename can be given instead of a source identifier,
+    in which case it is registered as a source of its own.
+
+    Token information is created for every token, so it is slotted: the
+    position is held as a handful of integers, with no dictionary.
     """
-    def __init__(self, filename: str, lineno: int, offset: int, line: str) -> None:
-        self.filename = filename
+    __slots__ = ('source_id', 'lineno', 'offset', 'index', '_line')
+
+    def __init__(self, source: Union[int, str], lineno: int, offset: int, line: Optional[str] = None,
+                 index: int = -1) -> None:
+        self.source_id = source if isinstance(source, int) else sources.register(source)
         self.lineno = lineno
         self.offset = offset
-        self.line = line
+        self.index = index
+        self._line = line
+
+    @classmethod
+    def capture(cls, scan: Union[Scanner, TokenInfo]) -> TokenInfo:
+        """
+        Take a snapshot of the position of a scanner.
+
+        For convenience, the position can also be copied from another instance
+        of token information.
+        """
+        if isinstance(scan, Scanner):
+            return cls(scan.source_id, scan.lineno, scan.offset, index=scan.index - 1)
+
+        if scan.__class__ is TokenOffset:  # An offset is never modified, and is shared rather than copied.
+            return scan
+
+        return cls(scan.source_id, scan.lineno, scan.offset, scan._line, scan.index)
+
+    @property
+    def filename(self) -> str:
+        """
+        The filename of the source the token was scanned from.
+        """
+        return sources.filename(self.source_id)
+
+    @property
+    def line(self) -> str:
+        """
+        The line of source code the token was scanned from.
+        """
+        if self._line is None:
+            self._line = sources.line(self.source_id, self.lineno)
+
+        return self._line
+
+
+class TokenOffset(TokenInfo):
+    """
+    Token information holding the position of a token as its absolute index in
+    the source only.
+
+    The line number and the column are found in the source when they are read,
+    which in practice only happens when an error is reported, rather than when
+    the token is created. They are unknown once the source has been released,
+    or its scanner freed.
+    """
+    __slots__ = ()
+
+    def __init__(self, source_id: int, index: int) -> None:
+        self.source_id = source_id
+        self.index = index
+        self._line = None
+
+    def __reduce__(self) -> tuple:
+        """
+        Pickle the offset as token information, its position being resolved in
+        this process, where the source is known.
+        """
+        return TokenInfo, (self.source_id, self.lineno, self.offset, self.line, self.index)
+
+    @classmethod
+    def capture(cls, scan: Scanner) -> TokenOffset:
+        """
+        Take the offset of the character being scanned.
+        """
+        return cls(scan.source_id, scan.index - 1)
+
+    @property
+    def lineno(self) -> int:
+        """
+        The line number of the token, found in its source.
+        """
+        return self._locate()[0]
+
+    @property
+    def offset(self) -> int:
+        """
+        The column of the token, found in its source.
+        """
+        return self._locate()[1]
+
+    def _locate(self) -> Tuple[int, int]:
+        """
+        The line number and the column of the token, or (-1, -1) if its source
+        is unknown.
+        """
+        scanner = sources.scanner(self.source_id)
+        return scanner.locate(self.index) if scanner is not None else (-1, -1)
 
 
 class Token:
@@ -128,7 +279,13 @@ class Token:
     are added to the token, unless a space is found in which case a post
     processing may be required, for instance converting the string lexeme into
     an int etc.
+
+    Tokens are created by the millions, so they are slotted. Once finalized,
+    a name carries the id of its identifier, and shares its lexeme with every
+    other occurrence of that identifier.
     """
+    __slots__ = ('info', 'symbol', 'literal', 'lexeme', 'quotes', 'name_id')
+
     def __init__(self, lexeme: str, scan: Scanner, force_literal=False) -> None:
         """
         Instantiate a new Token.
@@ -141,7 +298,8 @@ class Token:
             LythSyntaxError: The character being scanned could not lead to a
                              token.
         """
-        symbol = Symbol.as_value(lexeme)
+        self.info = TokenInfo.capture(scan)
+        symbol = _SYMBOLS.get(lexeme)
 
         if symbol is not None:
             self.symbol = symbol
@@ -153,14 +311,33 @@ class Token:
             self.symbol = Literal.STRING
 
         else:
-            raise LythSyntaxError(scan, msg=LythError.INVALID_CHARACTER)
+            raise LythSyntaxError(self.info, msg=LythError.INVALID_CHARACTER)
 
         self.literal = force_literal
-        self.info = TokenInfo(scan.filename, scan.lineno, scan.offset, scan.line)
         self.lexeme = lexeme
         self.quotes = 1 if self.symbol is Symbol.QUOTE else 0
+        self.name_id = -1
+
+    @classmethod
+    def make(cls, symbol: _Lexeme, lexeme: Union[str, int, None], info: TokenInfo, literal: bool = False,
+             quotes: int = 0) -> Token:
+        """
+        Instantiate a token whose symbol is already known.
 
-    def __call__(self) -> Token:
+        The lexeme is not validated, nor is the position captured from a
+        scanner: this is meant for lexers which recognize tokens by
+        themselves.
+        """
+        token = cls.__new__(cls)
+        token.info = info
+        token.symbol = symbol
+        token.literal = literal
+        token.lexeme = lexeme
+        token.quotes = quotes
+        token.name_id = -1
+        return token
+
+    def __call__(self, identifiers: Optional[IdentifierTable] = None) -> Token:
         """
         Finalizes the token.
 
@@ -170,10 +347,18 @@ class Token:
 
         If the token is an indent, the lexeme is the number of indents. The
         number of indents must be even, or an exception is raised.
+
+        If the token is a name, its identifier is interned in the table of
+        identifiers provided, usually the one of the scanner of its source.
         """
         if self.symbol is Literal.VALUE:
             self.lexeme = int(self.lexeme)
 
+        elif self.symbol is Literal.STRING:
+            if not self.literal and identifiers is not None:
+                self.name_id = identifiers.intern(self.lexeme)
+                self.lexeme = identifiers[self.name_id]
+
         elif self.symbol is Symbol.INDENT:
             if len(self.lexeme) % 2:
                 raise LythSyntaxError(self.info, msg=LythError.UNEVEN_INDENT)
@@ -182,6 +367,33 @@ class Token:
 
         return self
 
+    def splits(self, lexeme: str) -> bool:
+        """
+        Tell whether a lexeme following the token without a space starts a new
+        token.
+
+        The language requires spaces around operators, yet '-5', '(a', 'a)' or
+        'f(' are valid expressions. Rather than appending the lexeme and
+        recovering from the error the addition raises, the lexer asks first,
+        so that exceptions are only raised for real errors:
+        1. A word following '+', '-' or '(' starts a new token.
+        2. ')' following a literal starts a new token.
+        3. '(' following a string starts a new token, as in a call.
+        Nothing starts a new token within a docstring.
+        """
+        if self.literal:
+            return False
+
+        kind = self.symbol
+
+        if kind is Symbol.ADD or kind is Symbol.SUB or kind is Symbol.LPAREN:
+            return _is_word(lexeme)
+
+        if lexeme == ')':
+            return _IS_LITERAL[kind.code]
+
+        return lexeme == '(' and kind is Literal.STRING
+
     def __add__(self, lexeme: str) -> Token:
         """
         Add a scanned character to an existing token.
@@ -193,13 +405,13 @@ class Token:
         become an assignment if '-' is the next character being scanned.
 
         The methodology is the following:
-        1. Appending space to an indent token leads to an indent token with a
+        1. Appending spaces to an indent token leads to an indent token with a
            lexeme of incremented size.
         2. If the new lexeme appended to current lexeme leads to a new symbol,
            update symbol and new lexeme, and return this instance.
         3. If the new literal would be a symbol appended to a literal, there is
-           clearly a missing space. Exception, such as '5!' will be corrected
-           by the lexer.
+           clearly a missing space. Exceptions, such as '5)', are told apart
+           by the lexer beforehand.
         4. Appending a digit to a literal leads to appending the lexeme and
            returning current token.
         5. Appending an alphanumerical character, or '_', to a string value
@@ -210,7 +422,8 @@ class Token:
            it to be demoted back to string symbol.
         7. Appending an alphanumerical character, or '_', leading to a literal
            right after a symbol, without the presence of a space leads to an
-           error. Exception, such as '-5' will be corrected by the lexer.
+           error. Exceptions, such as '-5', are told apart by the lexer
+           beforehand.
         8. Appending a quote to a quote leaves the method unchanged and the
            same quote symbol is returned. It is up to the lexer to count the
            number of quotes in order to build a docstring.
@@ -225,45 +438,55 @@ class Token:
                 self.lexeme += lexeme
             return self
 
-        if self.symbol is Symbol.INDENT and lexeme == ' ':
+        kind = self.symbol
+
+        if kind is Symbol.INDENT and lexeme.isspace():
             self.lexeme += lexeme
             return self
 
-        symbol = Symbol.as_value(self.lexeme + lexeme)
+        if self.lexeme in _PREFIXES:
+            symbol = _SYMBOLS.get(self.lexeme + lexeme)
 
-        if symbol is not None:
-            self.symbol = symbol
-            self.lexeme += lexeme
-            return self
+            if symbol is not None:
+                self.symbol = symbol
+                self.lexeme = symbol.value
+                return self
 
-        symbol = Symbol.as_value(lexeme)
+        code = kind.code
 
-        if symbol is not None and self.symbol in Literal:
+        if lexeme in _SYMBOLS and _IS_LITERAL[code]:
             raise LythSyntaxError(self.info, msg=LythError.MISSING_SPACE_BEFORE_OPERATOR)
 
-        elif lexeme.isdigit() and self.symbol in Literal:
+        elif lexeme.isdigit() and _IS_LITERAL[code]:
             self.lexeme += lexeme
             return self
 
-        elif (lexeme.isalnum() or lexeme == '_') and self.symbol is Literal.STRING:
+        elif not _is_word(lexeme):
+            pass
+
+        elif kind is Literal.STRING:
             self.lexeme += lexeme
-            self.symbol = Keyword.as_value(self.lexeme) or self.symbol
+            keyword = _KEYWORDS.get(self.lexeme)
+
+            if keyword is not None:  # The lexeme of a keyword is shared by its tokens.
+                self.symbol = keyword
+                self.lexeme = keyword.value
+
             return self
 
-        elif (lexeme.isalnum() or lexeme == '_') and self.symbol in Keyword:
+        elif _IS_KEYWORD[code]:
             self.lexeme += lexeme
             self.symbol = Literal.STRING
             return self
 
-        elif (lexeme.isalnum() or lexeme == '_') and self.symbol in Symbol:
+        elif _IS_SYMBOL[code]:
             raise LythSyntaxError(self.info, msg=LythError.MISSING_SPACE_AFTER_OPERATOR)
 
-        elif (lexeme ==  '"' and self.symbol is Symbol.QUOTE):
+        if lexeme == '"' and kind is Symbol.QUOTE:
             self.quotes += 1
             return self
 
-        else:
-            raise LythSyntaxError(self.info, msg=LythError.SYNTAX_ERROR)
+        raise LythSyntaxError(self.info, msg=LythError.SYNTAX_ERROR)
 
     def __eq__(self, symbol: _Lexeme) -> bool:
         """
@@ -2,10 +2,18 @@
 This modules defines the command line parser.
 """
 import argparse
+import os
 
 parser = argparse.ArgumentParser(description="Lyth: A (monolithic) compiled language")
 
 parser.add_argument("-c", metavar="cmd", type=str, help="Execute command")
+parser.add_argument("--cache", choices=("on", "off", "clear"), default="off",
+                    help="Use the token cache, or not, or empty it before using it")
+parser.add_argument("--cache-dir", metavar="dir", type=str,
+                    default=os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "lyth"),
+                    help="The directory of the token cache")
+parser.add_argument("--cache-size", metavar="bytes", type=int, default=64 << 20,
+                    help="The size the token cache is kept under")
 
 
 def fetch(line):
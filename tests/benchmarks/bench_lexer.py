@@ -0,0 +1,97 @@
+"""
+Benchmarks for the lexer.
+
+These are not test cases, run them directly:
+
+    python tests/benchmarks/bench_lexer.py
+"""
+import os
+import time
+
+from lyth.compiler.lexer import Lexer
+from lyth.compiler.lexer import NumpyLexer
+from lyth.compiler.lexer import RegexLexer
+from lyth.compiler.scanner import Scanner
+
+
+def corpus(lines: int = 20_000) -> str:
+    """
+    Generate identifier-heavy source code.
+    """
+    return "".join(f"let some_long_identifier_{i} <- another_identifier_name * (value_{i} + 12345)\n"
+                   for i in range(lines))
+
+
+def parenthesis_corpus(lines: int = 20_000) -> str:
+    """
+    Generate parenthesis-heavy source code, with operators glued to their
+    operands as in 'f(a)' or '-5'.
+    """
+    return "".join(f"let x_{i} <- f(a_{i}) * (b_{i} + g(c_{i}) ) - h(d_{i}) * -5 + (2)\n" for i in range(lines))
+
+
+def bench_lexer(source: str, lexer: type = Lexer) -> None:
+    """
+    Lex the whole source and report the time it took.
+    """
+    begin = time.perf_counter()
+    count = sum(1 for _ in lexer(Scanner(source)))
+    elapsed = time.perf_counter() - begin
+    print(f"{lexer.__name__}: lexed {count} tokens ({len(source)} characters) in {elapsed:.3f} s: "
+          f"{elapsed / count * 1e6:.2f} us/token")
+
+
+def bench_positions(source: str, lexer: type = Lexer) -> None:
+    """
+    Lex the whole source with tokens positioned as usual, then by their offset
+    only, and report the speedup.
+    """
+    times = []
+
+    for positions in (False, True):
+        begin = time.perf_counter()
+        count = sum(1 for _ in lexer(Scanner(source), positions=positions))
+        times.append(time.perf_counter() - begin)
+
+    print(f"{lexer.__name__}: lexed {count} tokens in {times[0]:.3f} s, {times[1]:.3f} s with offsets only: "
+          f"x{times[0] / times[1]:.2f}")
+
+
+def bench_parallel(source: str, lexer: type = Lexer) -> None:
+    """
+    Lex the whole source serially, then in parallel with an increasing number
+    of workers, and report the speedup.
+    """
+    begin = time.perf_counter()
+    lexer(Scanner(source)).tokenize_all()
+    serial = time.perf_counter() - begin
+    print(f"{lexer.__name__}: serial {len(source) / 1e6:.1f} MB in {serial:.3f} s")
+
+    for workers in (2, 4, 8):
+        if workers > (os.cpu_count() or 1):
+            break
+
+        begin = time.perf_counter()
+        lexer.tokenize_parallel(source, workers=workers)
+        elapsed = time.perf_counter() - begin
+        print(f"{lexer.__name__}: {workers} workers in {elapsed:.3f} s: x{serial / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    source = corpus()
+    bench_lexer(source)
+    bench_lexer(source, RegexLexer)
+
+    source = parenthesis_corpus()
+    bench_lexer(source)
+    bench_lexer(source, RegexLexer)
+
+    bench_positions(source)
+    bench_positions(source, RegexLexer)
+
+    bench_parallel(corpus(100_000), RegexLexer)
+
+    source = corpus(200_000)
+    bench_lexer(source)
+    bench_lexer(source, RegexLexer)
+    bench_lexer(source, NumpyLexer)
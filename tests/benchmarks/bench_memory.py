@@ -0,0 +1,93 @@
+"""
+Benchmarks for the memory held by tokens.
+
+Three ways of keeping the tokens of a same source are compared:
+- before: a list of tokens laid out as they were before Token and TokenInfo
+  were slotted, each with a dictionary, and with a lexeme of its own.
+- after: a list of the tokens the lexers hand out.
+- buffer: a TokenBuffer, holding the tokens as arrays.
+
+These are not test cases, run them directly:
+
+    python tests/benchmarks/bench_memory.py
+"""
+import tracemalloc
+from typing import Callable
+from typing import Sized
+
+from lyth.compiler.lexer import Lexer
+from lyth.compiler.lexer import RegexLexer
+from lyth.compiler.scanner import Scanner
+from lyth.compiler.token import Token
+
+
+class UnslottedInfo:
+    """
+    Token information as it was laid out before it was slotted.
+    """
+    def __init__(self, source_id: int, lineno: int, offset: int, index: int) -> None:
+        self.source_id = source_id
+        self.lineno = lineno
+        self.offset = offset
+        self.index = index
+        self._line = None
+
+
+class UnslottedToken:
+    """
+    A token as it was laid out before it was slotted, its lexeme being a string
+    of its own rather than the value of its symbol or keyword.
+    """
+    def __init__(self, token: Token) -> None:
+        lexeme = token.lexeme
+
+        if isinstance(lexeme, str) and len(lexeme) > 1:
+            lexeme = lexeme[:1] + lexeme[1:]
+
+        info = token.info
+        self.info = UnslottedInfo(info.source_id, info.lineno, info.offset, info.index)
+        self.symbol = token.symbol
+        self.literal = token.literal
+        self.lexeme = lexeme
+        self.quotes = token.quotes
+
+
+def corpus(lines: int = 20_000) -> str:
+    """
+    Generate a source whose tokens are mostly short names and values.
+    """
+    return "".join(f"let a <- b * (c + {i % 100})\n" for i in range(lines))
+
+
+def measure(keep: Callable[[Lexer], Sized], lexer: Lexer) -> float:
+    """
+    The memory held by the tokens keep() returns from a lexer, in bytes per
+    token.
+
+    The tokens are lexed while memory is traced, so that what they hold, such
+    as their absolute index, is accounted for, but not the source itself.
+    """
+    tracemalloc.start()
+    tokens = keep(lexer)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(tokens)
+
+
+def bench_memory(source: str, lexer: type = Lexer) -> None:
+    """
+    Report the memory held by the tokens of the whole source, before and after
+    tokens were slotted, and in a token buffer.
+    """
+    before = measure(lambda lexed: [UnslottedToken(token) for token in lexed], lexer(Scanner(source)))
+    after = measure(list, lexer(Scanner(source)))
+    buffer = measure(lexer.tokenize_all, lexer(Scanner(source)))
+
+    print(f"{lexer.__name__}: before {before:.1f} bytes/token, after {after:.1f} bytes/token ({before / after:.1f}x), "
+          f"buffer {buffer:.1f} bytes/token ({before / buffer:.1f}x)")
+
+
+if __name__ == "__main__":
+    source = corpus()
+    bench_memory(source)
+    bench_memory(source, RegexLexer)
@@ -0,0 +1,42 @@
+"""
+Benchmarks for the parser.
+
+These are not test cases, run them directly:
+
+    python tests/benchmarks/bench_parser.py
+"""
+import time
+
+from lyth.compiler.lexer import Lexer
+from lyth.compiler.parser import Parser
+from lyth.compiler.scanner import Scanner
+
+
+def nested_blocks(depth: int = 1_000) -> str:
+    """
+    Generate let blocks nested into each other.
+    """
+    return "".join("  " * i + "let:\n" for i in range(depth)) + "  " * depth + "a <- 1\n"
+
+
+def nested_parenthesis(depth: int = 1_000) -> str:
+    """
+    Generate an expression with parentheses nested into each other.
+    """
+    return "a <- " + "not ( " * depth + "b + 1" + " )" * depth + "\n"
+
+
+def bench_parser(source: str, title: str) -> None:
+    """
+    Parse the whole source and report the time it took, lexing included.
+    """
+    begin = time.perf_counter()
+    count = sum(1 for _ in Parser(Lexer(Scanner(source))))
+    elapsed = time.perf_counter() - begin
+    print(f"{title}: parsed {count} statements ({len(source)} characters) in {elapsed:.3f} s")
+
+
+if __name__ == "__main__":
+    for depth in (1_000, 10_000):
+        bench_parser(nested_parenthesis(depth), f"{depth} parentheses")
+        bench_parser(nested_blocks(depth), f"{depth} blocks")
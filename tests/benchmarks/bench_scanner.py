@@ -0,0 +1,70 @@
+"""
+Benchmarks for the scanner.
+
+These are not test cases, run them directly:
+
+    python tests/benchmarks/bench_scanner.py
+"""
+import time
+
+from lyth.compiler.lexer import Lexer
+from lyth.compiler.scanner import Scanner
+
+
+def bench_append(appends: int = 100_000, batches: int = 10) -> None:
+    """
+    Append lines to a scanner, the way the console feeds it, and report the
+    cost of an append for each batch. It should remain flat.
+    """
+    scan = Scanner("")
+    line = "a <- a + 1\n"
+    size = appends // batches
+
+    for batch in range(batches):
+        begin = time.perf_counter()
+
+        for _ in range(size):
+            scan += line
+
+        elapsed = time.perf_counter() - begin
+        print(f"appends {batch * size:>7} - {(batch + 1) * size:>7}: {elapsed / size * 1e9:8.1f} ns/append")
+
+    begin = time.perf_counter()
+    count = sum(1 for _ in scan)
+    print(f"scanned {count} characters in {time.perf_counter() - begin:.3f} s")
+
+
+def bench_edit(lines: int = 20_000, edits: int = 100) -> None:
+    """
+    Type characters in the middle of a large source, and re-lex the lines
+    reported dirty, compared to scanning the whole source again.
+    """
+    source = "let a <- a + 1\n" * lines
+    scan = Scanner(source)
+    position = len(source) // 2
+
+    begin = time.perf_counter()
+
+    for edit in range(edits):
+        first, last = scan.apply_edit(position + edit, position + edit, "b")
+        for token in Lexer(scan):
+            if token.info.lineno > last:
+                break
+
+    elapsed = time.perf_counter() - begin
+    print(f"incremental: {elapsed / edits * 1e3:8.3f} ms/keystroke")
+
+    begin = time.perf_counter()
+
+    for edit in range(edits // 10):
+        source = source[:position + edit] + "b" + source[position + edit:]
+        for token in Lexer(Scanner(source)):
+            pass
+
+    elapsed = time.perf_counter() - begin
+    print(f"full:        {elapsed / (edits // 10) * 1e3:8.3f} ms/keystroke")
+
+
+if __name__ == "__main__":
+    bench_append()
+    bench_edit()
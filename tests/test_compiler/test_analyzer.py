@@ -225,3 +225,37 @@ def test_analyzer_let(clean_namespace):
     assert analyzer.table[('a', '__test__')].type.type == Field.UNKNOWN
     assert analyzer.table.left is None
     assert str(analyzer.table.right) == "a, __test__"
+
+
+def test_analyzer_operators(clean_namespace):
+    """
+    Operators without a method of their own are computed from their members.
+    """
+    analyzer = Analyzer(Parser(Lexer(Scanner('a <- 7 // 2 % 2 << 3 | 1 ^ 3 & 6\nb <- not a = 11 or ! a >= 0\nc <- - a - - 2\n',
+                                             '__test__'))))
+
+    analyzer()
+    analyzer()
+    analyzer()
+    assert analyzer.table[('a', '__test__')].type.value == 7 // 2 % 2 << 3 | 1 ^ 3 & 6
+    assert analyzer.table[('b', '__test__')].type.value is False
+    assert analyzer.table[('c', '__test__')].type.value == -9
+
+
+def test_analyzer_short_circuit(clean_namespace):
+    """
+    The right member of a logical and, or of a logical or, is only evaluated
+    if it is needed.
+    """
+    analyzer = Analyzer(Parser(Lexer(Scanner('a <- 0 and undefined\nb <- 1 or undefined\nc <- 1 and undefined\n',
+                                             '__test__'))))
+
+    analyzer()
+    analyzer()
+    assert analyzer.table[('a', '__test__')].type.value == 0
+    assert analyzer.table[('b', '__test__')].type.value == 1
+
+    with pytest.raises(LythSyntaxError) as err:
+        analyzer()
+
+    assert err.value.msg is LythError.VARIABLE_REFERENCED_BEFORE_ASSIGNMENT
@@ -0,0 +1,105 @@
+import pytest
+
+from lyth.compiler.buffer import TokenBuffer
+from lyth.compiler.error import LythSyntaxError
+from lyth.compiler.lexer import Lexer
+from lyth.compiler.lexer import RegexLexer
+from lyth.compiler.scanner import Scanner
+from lyth.compiler.token import Keyword
+from lyth.compiler.token import Literal
+from lyth.compiler.token import Symbol
+
+SOURCE = 'let:\n  a <- (1 + 22) * a\n  """\n  a doc "string\n  """\n'
+
+
+def _fields(token):
+    """
+    The fields of a token, and of its information.
+    """
+    return (token.symbol, token.lexeme, token.literal, token.info.lineno, token.info.offset, token.info.index,
+            token.info.line)
+
+
+def test_tokenize_all():
+    """
+    The buffer materialises the tokens the lexer produces.
+    """
+    scanner = Scanner(SOURCE)
+    buffer = Lexer(scanner).tokenize_all()
+    other = Scanner(SOURCE)  # Tokens read their lines from their scanner, which must be alive.
+    tokens = list(Lexer(other))
+
+    assert isinstance(buffer, TokenBuffer)
+    assert buffer.source_id == scanner.source_id
+    assert len(buffer) == len(tokens)
+    assert [_fields(t) for t in buffer] == [_fields(t) for t in tokens]
+
+    assert buffer.kind(0) is Keyword.LET
+    assert buffer.kind(-1) is Symbol.EOF
+    assert buffer.lexeme(4) == "a"
+    assert buffer.lexemes[4] == buffer.lexemes[12]
+    assert len(buffer.table) < len(buffer)
+    assert buffer[9].lexeme == 22 and buffer.lengths[9] == 2
+
+
+def test_buffer_slice():
+    """
+    A slice of a buffer is a buffer sharing its table of lexemes.
+    """
+    buffer = Lexer(Scanner(SOURCE)).tokenize_all()
+    part = buffer[4:9]
+
+    assert isinstance(part, TokenBuffer)
+    assert part.table is buffer.table
+    assert [t.symbol for t in part] == [Literal.STRING, Symbol.LASSIGN, Symbol.LPAREN, Literal.VALUE, Symbol.ADD]
+    assert part[0].info.line == "  a <- (1 + 22) * a"
+
+
+def test_tokenize_all_error():
+    """
+    Errors are raised as the lexer raises them.
+    """
+    with pytest.raises(LythSyntaxError):
+        Lexer(Scanner("a <-- 1\n")).tokenize_all()
+
+
+def _arrays(buffer):
+    """
+    The arrays of a buffer, with its lexemes resolved.
+    """
+    return (list(buffer.kinds), list(buffer.starts), list(buffer.lengths), list(buffer.linenos), list(buffer.offsets),
+            [buffer.table[lexeme_id] for lexeme_id in buffer.lexemes])
+
+
+@pytest.mark.parametrize("lexer", [Lexer, RegexLexer])
+def test_tokenize_parallel(lexer):
+    """
+    Lexing chunks of a source in parallel gives the buffer lexing it serially
+    does, docstrings, tabulations and blank lines spanning chunks included.
+    """
+    source = SOURCE * 20 + '\tb <- 1\r\n  \n\n' + SOURCE * 20
+    serial = lexer(Scanner(source)).tokenize_all()
+    parallel = lexer.tokenize_parallel(source, workers=4, chunk_size=100)
+
+    assert _arrays(parallel) == _arrays(serial)
+    assert parallel.table == serial.table
+    assert parallel[-1].info.filename == "<stdin>"
+
+    small = lexer.tokenize_parallel(SOURCE, workers=4)
+    assert _arrays(small) == _arrays(lexer(Scanner(SOURCE)).tokenize_all())
+
+
+def test_tokenize_parallel_error():
+    """
+    The error is the first one of the source, positioned in the whole source.
+    """
+    source = SOURCE * 20 + "  a <- $\n" + SOURCE * 5 + "!\n"
+
+    with pytest.raises(LythSyntaxError) as err:
+        Lexer.tokenize_parallel(source, workers=4, chunk_size=100)
+
+    with pytest.raises(LythSyntaxError) as serial:
+        Lexer(Scanner(source)).tokenize_all()
+
+    assert err.value.msg is serial.value.msg
+    assert (err.value.lineno, err.value.offset, err.value.line) == (serial.value.lineno, serial.value.offset, "  a <- $")
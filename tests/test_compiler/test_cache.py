@@ -0,0 +1,149 @@
+import io
+import os
+import sys
+
+import pytest
+
+from lyth.compiler.buffer import FORMAT
+from lyth.compiler.buffer import TokenBuffer
+from lyth.compiler.cache import TokenCache
+from lyth.compiler.lexer import Lexer
+from lyth.compiler.lexer import RegexLexer
+from lyth.compiler.scanner import Scanner
+from lyth.compiler.scanner import StreamScanner
+
+SOURCE = 'let:\n  a <- (1 + 22) * a\n  """\n  a doc "string é\n  """\n  b <- 123456789012345678901234567890\n'
+
+
+def _arrays(buffer):
+    """
+    The arrays of a buffer, with the lexemes resolved.
+    """
+    return ([list(getattr(buffer, name)) for name in ('kinds', 'starts', 'lengths', 'linenos', 'offsets')]
+            + [[buffer.table[lexeme] for lexeme in buffer.lexemes]])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """
+    Set a token cache in a temporary directory for the time of a test.
+    """
+    Lexer.cache = TokenCache(tmp_path)
+    yield Lexer.cache
+    Lexer.cache = None
+
+
+def test_buffer_bytes():
+    """
+    A buffer is rebuilt from its binary form, for another source.
+    """
+    buffer = Lexer(Scanner(SOURCE)).tokenize_all()
+    data = buffer.to_bytes()
+    other = TokenBuffer.from_bytes(data, 42)
+
+    assert other.source_id == 42
+    assert _arrays(other) == _arrays(buffer)
+    assert other.table == buffer.table
+
+    with pytest.raises(ValueError):
+        TokenBuffer.from_bytes(data[:-1], 42)
+
+    with pytest.raises(ValueError):
+        TokenBuffer.from_bytes(b'nothing to see here', 42)
+
+    with pytest.raises(ValueError):
+        TokenBuffer.from_bytes(data[:4] + (FORMAT ^ 1).to_bytes(4, sys.byteorder) + data[8:], 42)
+
+
+def test_cache_key(cache):
+    """
+    The key tells sources apart by their content and their first line, and
+    is only given for a scanner which has not started over its whole source.
+    """
+    key = cache.key(Scanner(SOURCE))
+
+    assert key == cache.key(Scanner(SOURCE, "other.lyth"))
+    assert key != cache.key(Scanner(SOURCE + "\n"))
+    assert key != cache.key(Scanner(SOURCE, lineno=1))
+    assert key != cache.key(Scanner(SOURCE.encode()))
+    assert cache.key(Scanner("a <- 1\t+ 2\n\n")) != cache.key(Scanner("a <- 1  + 2\n\n"))
+
+    scanner = Scanner(SOURCE)
+    scanner.read()
+    assert cache.key(scanner) is None
+
+    assert cache.key(StreamScanner(io.StringIO(SOURCE))) is None
+
+
+@pytest.mark.parametrize("lexer", [Lexer, RegexLexer])
+def test_cache_hit(cache, lexer):
+    """
+    A source lexed in full is stored, and its tokens replayed from then on.
+    """
+    expected = [(token.symbol, token.lexeme, token.literal, token.info.lineno, token.info.offset)
+                for token in lexer(Scanner(SOURCE))]
+    assert len(cache) == 1
+
+    buffer = lexer(Scanner(SOURCE)).tokenize_all()
+    assert _arrays(buffer) == _arrays(Lexer(Scanner(SOURCE)).tokenize_all())
+    assert [(token.symbol, token.lexeme, token.literal, token.info.lineno, token.info.offset)
+            for token in lexer(Scanner(SOURCE))] == expected
+
+    lexer(Scanner("c <- 1\n" + SOURCE)).tokenize_all()
+    assert len(cache) == 2
+
+
+def test_cache_partial(cache):
+    """
+    A source which has not been lexed in full is not stored, and a lexer which
+    has started does not take its buffer from the cache.
+    """
+    lexer = Lexer(Scanner(SOURCE))
+    first = lexer.advance()
+    assert len(cache) == 0
+
+    buffer = lexer.tokenize_all()
+    assert len(buffer) == len(Lexer(Scanner(SOURCE)).tokenize_all()) - 1
+    assert buffer.kind(0) is not first.symbol
+    assert len(cache) == 1
+
+
+def test_cache_corrupted(cache):
+    """
+    An entry which cannot be read back is a miss, and is removed.
+    """
+    Lexer(Scanner(SOURCE)).tokenize_all()
+    path = os.path.join(cache.directory, os.listdir(cache.directory)[0])
+
+    with open(path, 'wb') as f:
+        f.write(b'garbage')
+
+    assert cache.load(cache.key(Scanner(SOURCE)), 0) is None
+    assert not os.path.exists(path)
+
+
+def test_cache_eviction(tmp_path):
+    """
+    The least recently used entries are evicted once the cache is over its
+    size, and clear empties it.
+    """
+    cache = TokenCache(tmp_path / "cache")
+    sources = ["c <- 1\n" * count + SOURCE for count in range(4)]
+    buffers = [Lexer(Scanner(source)).tokenize_all() for source in sources]
+    keys = [cache.key(Scanner(source)) for source in sources]
+
+    for time, (key, buffer) in enumerate(zip(keys, buffers)):
+        cache.store(key, buffer)
+        os.utime(cache._path(key), (time, time))
+
+    assert len(cache) == 4
+    assert cache.load(keys[0], 0) is not None  # The first entry is now the most recently used.
+
+    cache.max_size = sum(len(buffer.to_bytes()) for buffer in buffers[2:]) + len(buffers[0].to_bytes())
+    cache.store(keys[3], buffers[3])
+
+    assert cache.load(keys[1], 0) is None
+    assert all(cache.load(key, 0) is not None for key in keys[2:] + keys[:1])
+
+    cache.clear()
+    assert len(cache) == 0
@@ -3,9 +3,12 @@ import pytest
 from lyth.compiler.error import LythError
 from lyth.compiler.error import LythSyntaxError
 from lyth.compiler.lexer import Lexer
+from lyth.compiler.lexer import NumpyLexer
+from lyth.compiler.lexer import RegexLexer
 from lyth.compiler.scanner import Scanner
 from lyth.compiler.token import Keyword
 from lyth.compiler.token import Literal
+from lyth.compiler.token import Sentinel
 from lyth.compiler.token import Symbol
 
 
@@ -304,3 +307,201 @@ def test_too_much_spaces():
     assert token.info.lineno == 0
     assert token.symbol == Symbol.EOL
     assert token.info.line == "let:    "
+
+
+@pytest.mark.parametrize("kind", [bytes, bytearray, memoryview])
+def test_lexer_buffer(kind):
+    """
+    A buffer of bytes is lexed as the string it encodes, docstrings included.
+    """
+    for source in ("let:\r\n\tvalue_é <- (1 + 2) * 3\n  b <- -5\n", '"""x"""\n', 'a <- 1\n"""\r\n\tdoc é\n"""\nb <- 2\n'):
+        buffer = kind(source.encode('utf-8'))
+
+        expected = [(t.symbol, t.lexeme, t.info.lineno, t.info.offset, t.info.line) for t in Lexer(Scanner(source))]
+        tokens = [(t.symbol, t.lexeme, t.info.lineno, t.info.offset, t.info.line) for t in Lexer(Scanner(buffer))]
+
+        assert tokens == expected
+
+    buffer = kind("let:\r\n\tvalue_é <- (1 + 2) * 3\n".encode('utf-8'))
+    assert ("STRING", "value_é") in [(t.symbol.name, t.lexeme) for t in Lexer(Scanner(buffer))]
+
+
+def test_lexer_memoryview_format():
+    """
+    A memoryview is scanned byte per byte, whatever its format.
+    """
+    buffer = memoryview(b"a <- 1\n").cast('B').cast('c')
+    assert [t.symbol for t in Lexer(Scanner(buffer))] == [Literal.STRING, Symbol.LASSIGN, Literal.VALUE,
+                                                          Symbol.EOL, Symbol.EOF]
+
+
+def _lex(lexer, source):
+    """
+    The tokens a lexer produces from a source, or the error it raises.
+    """
+    tokens = []
+
+    try:
+        for token in lexer(Scanner(source)):
+            tokens.append((token.symbol, token.lexeme, token.literal, token.info.lineno, token.info.offset,
+                           token.info.index, token.info.line))
+
+    except LythSyntaxError as error:
+        tokens.append((error.msg, error.lineno, error.offset, error.line))
+
+    return tokens
+
+
+@pytest.mark.parametrize("source", [
+    "let a <- (1 + 2) * 3\n",
+    "let:\n  a <- -5\n  f(b) -> c\n",
+    "a <- 1\n\t\tb <- a..4\n",
+    "\"\"\"\n  This is a docstring, with <- symbols and \"quotes\"\n\"\"\"\nlet a <- 1\n",
+    "a <-- 1\n",
+    "a <- 1;\n",
+    "a <- 1\n   b <- 2\n",
+    "a <- 12abc\n",
+    "a <- 1",
+    "a :\n",
+    "a\nb\n",
+])
+def test_regex_lexer(source):
+    """
+    The regex lexer produces the same tokens as the lexer, and raises the same
+    errors.
+    """
+    assert _lex(RegexLexer, source) == _lex(Lexer, source)
+
+
+@pytest.mark.parametrize("block", [8, 1 << 20])
+def test_numpy_lexer(block):
+    """
+    The NumPy lexer produces the same tokens as the lexer, and raises the same
+    errors, however the source is cut into blocks.
+    """
+    pytest.importorskip("numpy")
+
+    class BlockLexer(NumpyLexer):
+        pass
+
+    BlockLexer.block = block
+    source = "let é_1 <- (1 + 2) * -3\n\ta <- b .. 4 >= c\r\n\"\"\"\n  a <- doc\n\"\"\" x <- 1\n\n"
+
+    for text in (source, source[:57], source + "a <-- 1\n", source + "let a <- 12abc\n"):
+        assert _lex(BlockLexer, text) == _lex(Lexer, text)
+
+
+def test_regex_lexer_buffer():
+    """
+    Buffers are lexed by the lexer itself.
+    """
+    source = "let:\r\n\tvalue_é <- (1 + 2) * 3\n"
+    assert _lex(RegexLexer, source.encode()) == _lex(Lexer, source.encode())
+
+
+@pytest.mark.parametrize("lexer", [Lexer, RegexLexer])
+def test_identifiers(lexer):
+    """
+    Names are given the id of their identifier, in the table of their source,
+    and share their lexeme with the other occurrences of that identifier.
+    """
+    scanner = Scanner("let counter:\n  counter <- counter + 1\n")
+    tokens = [token for token in lexer(scanner) if token.symbol is Literal.STRING]
+    identifiers = scanner.identifiers
+
+    assert len(tokens) == 3
+    assert tokens[0].name_id == tokens[1].name_id == tokens[2].name_id == identifiers.intern("counter")
+    assert tokens[0].lexeme is tokens[1].lexeme is tokens[2].lexeme is identifiers[tokens[0].name_id]
+    assert len(identifiers) == 1 and len(Scanner("other\n").identifiers) == 0
+
+
+def test_lexer_peek():
+    """
+    Tokens are looked ahead without being consumed, and consumed once.
+    """
+    lexer = Lexer(Scanner("let a <- 1\n"))
+
+    assert lexer.peek().symbol is Keyword.LET
+    assert lexer.peek(2).symbol is Symbol.LASSIGN
+    assert lexer.peek(1).lexeme == "a"
+    assert lexer.advance().symbol is Keyword.LET
+    assert lexer.peek(2).lexeme == 1
+    assert lexer().lexeme == "a"
+    assert [token.symbol for token in lexer] == [Symbol.LASSIGN, Literal.VALUE, Symbol.EOL, Symbol.EOF]
+
+    with pytest.raises(StopIteration):
+        lexer.peek()
+
+    with pytest.raises(ValueError):
+        lexer.peek(4)
+
+
+@pytest.mark.parametrize("lexer", [Lexer, RegexLexer])
+def test_docstring(lexer):
+    """
+    A docstring is handed out as a single doc token holding its text, whether
+    it is scanned from a string or from a stream by chunks.
+    """
+    from io import StringIO
+
+    from lyth.compiler.scanner import StreamScanner
+
+    source = 'let a <- 1\n"""\n  Doc with <- and "quotes"\n"""\nlet b <- 2\n'
+    expected = [Keyword.LET, Literal.STRING, Symbol.LASSIGN, Literal.VALUE, Symbol.EOL, Symbol.DOC, Symbol.EOL,
+                Keyword.LET, Literal.STRING, Symbol.LASSIGN, Literal.VALUE, Symbol.EOL, Symbol.EOF]
+
+    for scanner in (Scanner(source), StreamScanner(StringIO(source), chunk_size=5)):
+        tokens = list(lexer(scanner))
+
+        assert [token.symbol for token in tokens] == expected
+        assert tokens[5].lexeme == '\n  Doc with <- and "quotes"\n'
+        assert (tokens[5].info.lineno, tokens[5].info.offset) == (1, 2)
+        assert (tokens[7].info.lineno, tokens[7].info.offset) == (4, 0)
+
+
+@pytest.mark.parametrize("lexer", [Lexer, RegexLexer])
+def test_recover(lexer):
+    """
+    A recovering lexer records every error of a source, with the code the
+    lexer raises, hands out the text skipped as error tokens, and carries on.
+    """
+    source = "a <- 12abc + b\n  c <- 1;x\n   d <- 2\nlet e :\n\tf <- 3"
+    recovering = lexer(Scanner(source), recover=True)
+    tokens = list(recovering)
+
+    assert [error.msg for error in recovering.diagnostics] == [
+        LythError.SYNTAX_ERROR, LythError.SYNTAX_ERROR, LythError.UNEVEN_INDENT, LythError.TOO_MUCH_SPACE_BEFORE,
+        LythError.MISSING_EMPTY_LINE]
+    assert [(token.lexeme, token.info.lineno, token.info.offset) for token in tokens
+            if token.symbol is Sentinel.ERROR] == [("12abc", 0, 5), ("1;x", 1, 7), ("   d", 2, 0), (":", 3, 6)]
+    assert [token.symbol for token in tokens[3:6]] == [Symbol.ADD, Literal.STRING, Symbol.EOL]
+    assert tokens[-1].symbol is Symbol.EOF
+
+    with pytest.raises(LythSyntaxError) as error:
+        list(lexer(Scanner(source)))
+
+    assert (error.value.msg, error.value.lineno, error.value.offset) == (LythError.SYNTAX_ERROR, 0, 5)
+
+
+@pytest.mark.parametrize("lexer", [Lexer, RegexLexer])
+def test_positions(lexer):
+    """
+    Tokens lexed in positions mode only record their offset, yet report the
+    positions, lines and errors the lexer reports.
+    """
+    import pickle
+
+    from lyth.compiler.token import TokenInfo
+    from lyth.compiler.token import TokenOffset
+
+    source = "let:\n\t\ta <- -5\n  f(b) -> c\n\"\"\"\n  doc\n\"\"\" x <- 1\n"
+    scanner = Scanner(source)  # Offsets are located in their scanner, which must be alive.
+    tokens = list(lexer(scanner, positions=True))
+
+    assert _lex(lambda scanner: lexer(scanner, positions=True), source) == _lex(lexer, source)
+    assert _lex(lambda scanner: lexer(scanner, positions=True), "a <- 1\n\t\tb <- 2a\n") == _lex(lexer, "a <- 1\n\t\tb <- 2a\n")
+    assert isinstance(tokens[0].info, TokenOffset)
+
+    info = pickle.loads(pickle.dumps(tokens[4].info))
+    assert info.__class__ is TokenInfo
+    assert (info.lineno, info.offset, info.index, info.line) == (1, 2, 9, "    a <- -5")
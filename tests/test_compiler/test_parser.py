@@ -1,3 +1,5 @@
+import sys
+
 import pytest
 
 from lyth.compiler.ast import NodeType
@@ -229,6 +231,52 @@ def test_parser_parenthesis():
     assert str(expr) == "Noop()"
 
 
+def test_parser_nesting():
+    """
+    To validate the parser is not limited by the stack of Python, however deep
+    parentheses and blocks nest.
+    """
+    depth = sys.getrecursionlimit() * 2
+
+    parser = Parser(Lexer(Scanner("a <- " + "! ( " * depth + "1" + " )" * depth + "\n")))
+    node = parser().right
+
+    for _ in range(depth):
+        assert node.name is NodeType.Flip
+        node = node.value
+
+    assert node.name is NodeType.Num
+
+    parser = Parser(Lexer(Scanner("".join("  " * i + "let:\n" for i in range(depth)) + "  " * depth + "a <- 1\n")))
+    node = parser()
+
+    for _ in range(depth):
+        assert node.name is NodeType.Let
+        node, = node
+
+    assert str(node) == "MutableAssign(Name(a), Num(1))"
+
+
+@pytest.mark.parametrize("source, tree", [
+    ("1 + 2 * 3 % 4 << 1 | 5 & 6 ^ 7\n",
+     "BitOr(LShift(Add(Num(1), Mod(Mul(Num(2), Num(3)), Num(4))), Num(1)), Xor(BitAnd(Num(5), Num(6)), Num(7)))"),
+    ("not a = 1 and b < 2 or c >= 3\n", "Or(And(Not(Eq(Name(a), Num(1))), Lt(Name(b), Num(2))), Gte(Name(c), Num(3)))"),
+    ("! 5 + 1 .. 2 * 3\n", "Range(Add(Flip(Num(5)), Num(1)), Mul(Num(2), Num(3)))"),
+    ("a in b is c != d // e >> f - g / h\n",
+     "Diff(Is(In(Name(a), Name(b)), Name(c)), RShift(Floor(Name(d), Name(e)), Sub(Name(f), Div(Name(g), Name(h)))))"),
+    ("a > b <= c - (d + e)\n", "Lte(Gt(Name(a), Name(b)), Sub(Name(c), Add(Name(d), Name(e))))"),
+    ("not not a\n", "Not(Not(Name(a)))"),
+    ("- a . b * - 1 - - c\n", "Sub(Mul(Neg(Attribute(Name(a), Name(b))), Neg(Num(1))), Neg(Name(c)))"),
+    ("a is at b of c . d + 1\n", "Is(Name(a), Add(At(Of(Name(b), Attribute(Name(c), Name(d)))), Num(1)))"),
+])
+def test_parser_operators(source, tree):
+    """
+    Every operator is parsed with its precedence, binary operators of a same
+    precedence being left associative.
+    """
+    assert str(Parser(Lexer(Scanner(source)))()) == tree
+
+
 def test_parser_invalid_expression():
     """
     To validate the parser detects the expression it evaluates is invalid.
@@ -293,3 +341,21 @@ def test_parser_wrong_expression():
         parser()
 
     assert err.value.msg is LythError.LET_ON_EXPRESSION
+
+
+def test_parser_statement_ends():
+    """
+    To validate a statement is parsed up to its end, whether it is an end of
+    line, or the end of file ending a block.
+    """
+    parser = Parser(Lexer(Scanner("let:\n  a <- 1 + 2\n\n")))
+    assert [str(node) for node in parser] == ["Let(MutableAssign(Name(a), Add(Num(1), Num(2))))", "Noop()"]
+
+    parser = Parser(Lexer(Scanner("a <- 1 <- 2\n")))
+
+    with pytest.raises(LythSyntaxError) as err:
+        next(parser)
+
+    assert err.value.msg is LythError.GARBAGE_CHARACTERS
+    assert err.value.lineno == 0
+    assert err.value.offset == 7
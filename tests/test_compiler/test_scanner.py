@@ -1,5 +1,7 @@
 import pytest
 
+from lyth.compiler.error import LythSyntaxError
+from lyth.compiler.lexer import Lexer
 from lyth.compiler.scanner import Scanner
 
 
@@ -171,3 +173,437 @@ def test_scanner_respawn():
     assert f"{scan!s}" == f"in line 1 column 0"
     assert f"{scan!r}" == f"in line 1 column 0:\n\t\"b\"\n\t ^"
     assert scan.line == 'b'
+
+
+def test_line_at():
+    """
+    Lines are looked up in a table built once, and can be retrieved at any
+    time, even after the scanner reached the end of the source.
+    """
+    scan = Scanner("a\n\tb\r\n\nc", lineno=3)
+
+    for _ in scan:
+        pass
+
+    assert scan._lines == [0, 2, 6, 7]
+    assert scan.line_at(2) == ''
+    assert scan.line_at(3) == 'a'
+    assert scan.line_at(4) == '  b'
+    assert scan.line_at(5) == ''
+    assert scan.line_at(6) == 'c'
+    assert scan.line_at(7) == ''
+
+    scan = Scanner("a")
+    scan += "\nb\n"
+    assert scan._lines == [0, 2, 4]
+    assert scan.line_at(1) == 'b'
+
+
+def test_from_path(tmp_path):
+    """
+    A file mapped in memory is scanned as if it were read as a string.
+    """
+    source = "let:\r\n\ta <- 1\n  é <- 2\n"
+    path = tmp_path / "source.lyth"
+    path.write_bytes(source.encode('utf-8'))
+
+    scan = Scanner.from_path(path)
+    assert scan.filename == str(path)
+    assert not isinstance(scan.data, str)
+
+    reference = Scanner(source)
+
+    for char in reference:
+        assert scan() == char
+        assert scan.lineno == reference.lineno
+        assert scan.offset == reference.offset
+        assert scan.line == reference.line
+
+    with pytest.raises(StopIteration):
+        scan()
+
+    assert scan.line_at(2) == "  é <- 2"
+
+    path.write_bytes(b'')
+    scan = Scanner.from_path(path, filename="empty.lyth")
+    assert scan.filename == "empty.lyth"
+
+    with pytest.raises(StopIteration):
+        scan()
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_stream_scanner(binary):
+    """
+    A stream is scanned by chunks as if it were read as a string, but only the
+    last lines are kept in memory.
+    """
+    from io import BytesIO
+    from io import StringIO
+
+    from lyth.compiler.scanner import StreamScanner
+
+    source = "".join(f"a{i} <- {i} + é\r\n" for i in range(100))
+    stream = BytesIO(source.encode('utf-8')) if binary else StringIO(source)
+    scan = StreamScanner(stream, chunk_size=7, history=2)
+    reference = Scanner(source)
+
+    for char in reference:
+        assert scan() == char
+        assert scan.lineno == reference.lineno
+        assert scan.offset == reference.offset
+        assert scan.line == reference.line
+        assert sum(len(chunk) for chunk in scan._chunks) < 64
+
+    with pytest.raises(StopIteration):
+        scan()
+
+    assert scan.line_at(97) == "a97 <- 97 + é"
+    assert scan.line_at(50) == ""
+
+
+def test_scanner_chunks():
+    """
+    Appending to a scanner stores a new chunk, lines may span several chunks.
+    """
+    scan = Scanner("le")
+    scan += "t a"
+    scan += " <- 1\nb"
+    scan += "\n"
+
+    assert scan._chunks == ["le", "t a", " <- 1\nb", "\n"]
+    assert scan.line_at(0) == "let a <- 1"
+    assert scan.line_at(1) == "b"
+
+    reference = Scanner("let a <- 1\nb\n")
+
+    for char in reference:
+        assert scan() == char
+        assert scan.index == reference.index
+        assert scan.line == reference.line
+
+    with pytest.raises(StopIteration):
+        scan()
+
+
+def test_spans():
+    """
+    The scanner can hand out runs of letters, digits or spaces at once, and
+    is positioned on their first character while doing so.
+    """
+    scan = Scanner("let a_b1 <-\t(12)\r\n  c\n")
+    spans = scan.spans()
+
+    expected = [("let", 0, 0), (" ", 0, 3), ("a_b", 0, 4), ("1", 0, 7), (" ", 0, 8), ("<", 0, 9),
+                ("-", 0, 10), ("  ", 0, 11), ("(", 0, 12), ("12", 0, 13), (")", 0, 15), ("\n", 0, 15),
+                ("  ", 1, 0), ("c", 1, 2), ("\n", 1, 2)]
+
+    for span, lineno, offset in expected:
+        assert next(spans) == span
+        assert scan.lineno == lineno
+        assert scan.offset == offset
+
+    with pytest.raises(StopIteration):
+        next(spans)
+
+    scan = Scanner(b"ab\xc3\xa9 12\n")
+    assert list(scan.spans()) == ["ab", "é", " ", "12", "\n"]
+
+
+def test_normalisation():
+    """
+    Carriage returns and tabulations are dealt with once, when the string is
+    given to the scanner, but columns still refer to the original text.
+    """
+    scan = Scanner("a\tb\r\n\t\tc\t\r\n")
+    assert scan._chunks == ["a  b\n    c  \n"]
+    assert scan._tabs == {0: [1], 1: [0, 2, 5]}
+
+    spans = scan.spans()
+    expected = [("a", 0), ("  ", 1), ("b", 2), ("\n", 2), ("    ", 0), ("c", 2), ("  ", 3), ("\n", 3)]
+
+    for span, offset in expected:
+        assert next(spans) == span
+        assert scan.offset == offset
+
+    scan = Scanner("a\t")
+    scan += "\tb\n"
+    assert scan._tabs == {0: [1, 3]}
+    assert [(char, scan.offset) for char in scan] == [("a", 0), (" ", 1), (" ", 1), (" ", 2), (" ", 2),
+                                                      ("b", 3), ("\n", 3)]
+
+
+def test_mark_reset():
+    """
+    The scanner can be reset to a checkpoint, as many times as needed, and
+    reads the same characters or spans again.
+    """
+    scan = Scanner("a <- b\n")
+    scan += "c..d\n"
+
+    assert scan() == "a"
+    mark = scan.mark()
+    read = [(scan(), scan.lineno, scan.offset, scan.index) for _ in range(8)]
+
+    scan.reset(mark)
+    assert scan.offset == 0
+    assert [(scan(), scan.lineno, scan.offset, scan.index) for _ in range(8)] == read
+    assert read[-1] == (".", 1, 1, 9)
+
+    scan.reset(mark)
+    scan.doc = True
+    assert scan.read_span() == " "
+    assert scan.read_span() == "<"
+    lookahead = scan.mark()
+    assert scan.read_span() == "-"
+    scan.reset(lookahead)
+    assert scan.doc
+    assert scan.read_span() == "-"
+
+    for _ in scan:
+        pass
+
+    scan.reset(mark)
+    assert list(scan.spans()) == [" ", "<", "-", " ", "b", "\n", "c", ".", ".", "d", "\n"]
+    assert scan.lineno == 2
+    assert scan.offset == -1
+
+
+def test_mark_out_of_window():
+    """
+    A stream scanner cannot be reset to a chunk it dropped.
+    """
+    from io import StringIO
+
+    from lyth.compiler.scanner import StreamScanner
+
+    scan = StreamScanner(StringIO("a\n" * 20), chunk_size=2, history=1)
+    scan()
+    mark = scan.mark()
+
+    for _ in scan:
+        pass
+
+    with pytest.raises(ValueError):
+        scan.reset(mark)
+
+
+def test_seek_index():
+    """
+    The scanner resumes from an absolute index as if it had just read the
+    character before it, which is the same as reading up to there.
+    """
+    from io import StringIO
+
+    from lyth.compiler.scanner import StreamScanner
+
+    source = "a <- b\n\tc..d\n"
+    scan = Scanner(source)
+    reference = Scanner(source)
+
+    for _ in range(10):
+        reference()
+
+    scan.seek_index(reference.index)
+    assert scan.resume == reference.resume
+    assert (scan.index, scan.lineno, scan.offset) == (reference.index, reference.lineno, reference.offset)
+    assert list(scan.spans()) == list(reference.spans())
+
+    assert scan.line_start(1) == 7
+    assert scan.tabs(1) == [0]
+    assert scan.tabs(0) == ()
+    assert scan.tab_positions() == [7]
+    assert scan.text(7, 12) == "  c.."
+    assert scan.is_whole_source()
+    assert not StreamScanner(StringIO(source)).is_whole_source()
+
+    with pytest.raises(ValueError):
+        scan.seek_index(len(source) + 2)
+
+    with pytest.raises(ValueError):
+        scan.line_start(3)
+
+
+def test_apply_edit():
+    """
+    An edit updates the buffer and the line table, and reports the lines to
+    lex again.
+    """
+    scan = Scanner("a <- 1\n")
+    scan += "b <- 2\n"
+    scan += "c <- 3\n"
+
+    assert scan.apply_edit(12, 13, "20\nd <- 4") == (1, 2)
+    assert scan._lines == [0, 7, 15, 22, 29]
+    assert [scan.line_at(lineno) for lineno in range(4)] == ["a <- 1", "b <- 20", "d <- 4", "c <- 3"]
+    assert (scan.index, scan.lineno, scan.offset) == (7, 1, -1)
+    assert "".join(scan) == "b <- 20\nd <- 4\nc <- 3\n"
+
+    assert scan.apply_edit(7, 16, "") == (1, 1)
+    assert [scan.line_at(lineno) for lineno in range(3)] == ["a <- 1", " <- 4", "c <- 3"]
+
+    with pytest.raises(ValueError):
+        scan.apply_edit(0, 100, "")
+
+
+def test_apply_edit_tabs():
+    """
+    Tabulations are recorded again on the edited lines, and renumbered on the
+    following ones.
+    """
+    scan = Scanner("a\tb\n\tc\n")
+    scan.apply_edit(2, 3, "\n\tb")
+
+    assert scan._tabs == Scanner("a\t\n\tb\n\tc\n")._tabs == {0: [1], 1: [0], 2: [0]}
+    assert scan._lines == [0, 4, 8, 12]
+
+
+def test_apply_edit_crlf():
+    """
+    Offsets of an edit are in the original text, carriage returns and
+    tabulations included, as an editor sends them.
+    """
+    source = "a <-\t1\r\n\tb <- 2\r\nc <- 3\r\n"
+    scan = Scanner(source)
+
+    assert scan.position(source.index("b")) == 10
+    assert scan.position(source.index("\r")) == scan.position(source.index("\n")) == 7
+
+    assert scan.apply_edit(source.index("b"), source.index("b") + 1, "d\r\n\te") == (1, 2)
+    assert [scan.line_at(lineno) for lineno in range(4)] == ["a <-  1", "  d", "  e <- 2", "c <- 3"]
+    assert scan._crs == {0: [7], 1: [3], 2: [8], 3: [6]}
+
+    edited = "a <-\t1\r\n\td\r\n\te <- 2\r\nc <- 3\r\n"
+    scan.apply_edit(edited.index("\r\nc"), edited.index("c"), "")
+    assert [scan.line_at(lineno) for lineno in range(3)] == ["a <-  1", "  d", "  e <- 2c <- 3"]
+    assert (scan._tabs, scan._crs) == (Scanner("a <-\t1\r\n\td\r\n\te <- 2c <- 3\r\n")._tabs, {0: [7], 1: [3], 2: [14]})
+
+
+def test_apply_edit_docstring():
+    """
+    Opening or closing a docstring makes every following line dirty. An edit
+    within a docstring makes it dirty from the line opening it, as it is a
+    single token, and the scanner resumes within a docstring when moved to
+    one of its lines.
+    """
+    scan = Scanner('a <- 1\n"""\nb\n"""\nc <- 3\n')
+
+    assert scan.apply_edit(7, 10, "") == (1, 5)
+    assert scan.apply_edit(7, 7, '"""') == (1, 5)
+    assert scan.apply_edit(11, 11, "d") == (1, 3)
+    assert not scan.doc
+
+    scan.seek(2)
+    assert scan.doc
+
+
+def test_apply_edit_in_docstring():
+    """
+    The doc token of a docstring spanning several lines changes with an edit
+    of any of its lines, and is lexed again from the line opening it.
+    """
+    source = 'let:\n(a + b)\n"""\nlet:\ndoc\nlet:\n\n'
+    edited = source[:29] + 'a\nb' + source[29:]
+    scan = Scanner(source)
+
+    assert scan.apply_edit(29, 29, 'a\nb') == (2, 6)
+
+    tokens = [(token.symbol, token.lexeme, token.info.lineno) for token in Lexer(scan)]
+    expected = [(token.symbol, token.lexeme, token.info.lineno) for token in Lexer(Scanner(edited))]
+    assert tokens == [token for token in expected if token[2] >= 2]
+
+
+def _tokens(scan, last=None):
+    """
+    The tokens a lexer produces from where a scanner stands, up to a line, or
+    None if the source cannot be lexed.
+    """
+    tokens = []
+
+    try:
+        for token in Lexer(scan):
+            if last is not None and token.info.lineno > last:
+                break
+
+            tokens.append((token.symbol, token.lexeme, token.literal, token.info.lineno, token.info.offset))
+
+    except LythSyntaxError:
+        return None
+
+    return tokens
+
+
+@pytest.mark.parametrize("kind", [str, bytes])
+def test_apply_edit_relex(kind):
+    """
+    Edit after edit, lexing again the range of lines reported, and keeping the
+    tokens of the lines before it and after it, the latter being renumbered,
+    gives the tokens of the whole source lexed again.
+    """
+    import random
+
+    lines = ['let:', '  a <- 1', 'a <- (1 + b)', '"""', 'doc', '', '', '    ', '"""d"""', '""" c -> d', '\tq <- 3',
+             'a <- 1\r', 'a <- 1\t', 'x', '    b <- 2']
+    texts = ['a', '\n', 'a\nb', '"""', ' ', '', 'let:\n', '\t', '\r\n', '\n  ', 'x\n\n', '""']
+    generator = random.Random(0)
+    edits = 0
+
+    for _ in range(400):
+        source = '\n'.join(generator.choice(lines) for _ in range(generator.randint(2, 10))) + '\n\n'
+        scan = Scanner(kind(source, 'utf-8') if kind is bytes else source)
+        before = _tokens(Scanner(kind(source, 'utf-8') if kind is bytes else source))
+
+        for _ in range(6):
+            start = generator.randint(0, len(source))
+            end = generator.randint(start, min(start + 6, len(source)))
+            text = generator.choice(texts)
+            edited = source[:start] + text + source[end:]
+            shift = edited.count('\n') - source.count('\n')
+
+            first, last = scan.apply_edit(start, end, text)
+            after = _tokens(Scanner(kind(edited, 'utf-8') if kind is bytes else edited))
+            source = edited
+
+            if before is not None and after is not None:
+                assert [token for token in before if token[3] < first] + _tokens(scan, last) + [
+                    (*token[:3], token[3] + shift, token[4]) for token in before if token[3] + shift > last] == after
+                edits += 1
+
+            before = after
+
+    assert edits > 400
+
+
+def test_apply_edit_bytes():
+    """
+    Edits of a buffer are encoded, and the buffer itself is not modified.
+    """
+    data = bytearray(b"a <- 1\nb <- 2\n")
+    scan = Scanner(data)
+
+    assert scan.apply_edit(5, 6, "é") == (0, 0)
+    assert data == b"a <- 1\nb <- 2\n"
+    assert scan.line_at(0) == "a <- é"
+    assert scan._lines == [0, 8, 15]
+
+
+def test_read_until():
+    """
+    The scanner is shifted past a needle at once, and left where it would have
+    been, had the text been read character by character.
+    """
+    source = 'a """\nb\n  c""" d\n'
+    scan = Scanner(source)
+    reference = Scanner(source)
+
+    for _ in range(5):
+        scan(), reference()
+
+    assert scan.read_until('"""') == ("\nb\n  c", True)
+
+    for _ in range(9):
+        reference()
+
+    assert (scan.index, scan.lineno, scan.offset) == (reference.index, reference.lineno, reference.offset)
+    assert scan() == reference() == " "
+    assert scan.read_until('"""') == ("d\n", False)
@@ -0,0 +1,151 @@
+import pickle
+import weakref
+
+import pytest
+
+from lyth.compiler.ast import Node
+from lyth.compiler.error import LythError
+from lyth.compiler.error import LythSyntaxError
+from lyth.compiler.lexer import Lexer
+from lyth.compiler.scanner import Scanner
+from lyth.compiler.source import SourceManager
+from lyth.compiler.source import sources
+from lyth.compiler.token import Token
+from lyth.compiler.token import TokenInfo
+
+
+def test_source_manager():
+    """
+    Sources are given identifiers in sequence, filenames alone are given the
+    same identifier each time they are registered. Released sources are
+    removed from the registry, and their identifiers are not given again.
+    """
+    manager = SourceManager()
+    scan = Scanner("a <- 1\n")
+
+    assert manager.register("a.lyth", scan) == 0
+    assert manager.register("b.lyth") == 1
+    assert manager.register("b.lyth") == 1
+    assert manager.register("a.lyth", scan) == 2
+    assert len(manager) == 3
+
+    assert manager.filename(0) == "a.lyth"
+    assert manager.filename(1) == "b.lyth"
+    assert manager.filename(42) == "<unknown>"
+    assert manager.line(0, 0) == "a <- 1"
+    assert manager.line(1, 0) == ""
+
+    manager.release(0)
+    assert manager.scanner(0) is None
+    assert manager.filename(0) == "<unknown>"
+    assert manager.line(0, 0) == ""
+    assert len(manager) == 2
+
+    manager.release(1)
+    assert manager.filename(1) == "b.lyth"
+    assert manager.register("c.lyth", scan) == 3
+
+
+def test_source_manager_release():
+    """
+    The registry does not grow with the sources compiled one after the other,
+    as the inputs of an interactive session are.
+    """
+    manager = SourceManager()
+    scan = Scanner("a <- 1\n")
+
+    for _ in range(1000):
+        manager.release(manager.register("<stdin>", scan))
+
+    assert len(manager) == 0
+
+
+def test_scanner_freed(tmp_path):
+    """
+    The registry does not keep scanners alive: once nothing else holds them,
+    they are freed with their source, and a file mapped in memory is unmapped.
+    A buffer holds the scanner of its source, for its tokens to read their
+    lines.
+    """
+    path = tmp_path / "freed.lyth"
+    path.write_text("a <- 1\n")
+
+    scans = [Scanner("a <- 1\n" * 1000), Scanner.from_path(path)]
+    refs = [weakref.ref(scans[0]), weakref.ref(scans[1]), weakref.ref(scans[1].data)]
+    ids = [scan.source_id for scan in scans]
+    buffer = Lexer(Scanner("b <- 2\n")).tokenize_all()
+
+    del scans
+    assert [ref() for ref in refs] == [None, None, None]
+    assert [sources.scanner(source_id) for source_id in ids] == [None, None]
+    assert sources.line(ids[0], 0) == ""
+    assert buffer[0].info.line == "b <- 2"
+
+
+def test_scanner_source_id():
+    """
+    A scanner registers its source, and tokens only carry its identifier.
+    """
+    scan = Scanner("a <- 1\n", filename="ids.lyth")
+
+    assert sources.filename(scan.source_id) == scan.filename == "ids.lyth"
+    assert sources.scanner(scan.source_id) is scan
+
+    token = next(Lexer(scan))
+    assert token.info.source_id == scan.source_id
+    assert token.info.filename == "ids.lyth"
+    assert not hasattr(token.info, "__dict__")
+
+    node = Node(token)
+    assert node.source_id == scan.source_id
+    assert node.filename == "ids.lyth"
+    assert node.line == "a <- 1"
+
+    info = TokenInfo("<stdin>", 0, 0)
+    assert info.source_id == TokenInfo("<stdin>", 0, 0).source_id
+    assert info.filename == "<stdin>"
+
+
+def test_pickle():
+    """
+    Tokens, nodes and errors are pickled without their source, and still
+    resolve their line in the process the source is registered in.
+    """
+    scan = Scanner("a <- 1\n", filename="pickle.lyth")
+    token = next(Lexer(scan))
+
+    data = pickle.dumps(Node(token))
+    assert b"a <- 1" not in data
+
+    node = pickle.loads(data)
+    assert node.filename == "pickle.lyth"
+    assert node.line == "a <- 1"
+
+    with pytest.raises(LythSyntaxError) as err:
+        Token(";", scan)
+
+    error = pickle.loads(pickle.dumps(err.value))
+    assert error.msg is LythError.INVALID_CHARACTER
+    assert error.filename == "pickle.lyth"
+    assert error.line == "a <- 1"
+
+
+def test_pickle_error_unknown_source():
+    """
+    An error unpickled where its source is unknown, as in another process,
+    still reports its filename and its line.
+    """
+    scan = Scanner("a <- 1\n", filename="remote.lyth")
+    next(Lexer(scan))
+
+    with pytest.raises(LythSyntaxError) as err:
+        Token(";", scan)
+
+    data = pickle.dumps(err.value)
+    sources.release(scan.source_id)
+
+    error = pickle.loads(data)
+    assert error.source_id == scan.source_id
+    assert error.filename == "remote.lyth"
+    assert error.line == "a <- 1"
+    assert str(error).startswith("Invalid character at 'remote.lyth', line 0:")
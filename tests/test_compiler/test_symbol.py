@@ -1,5 +1,6 @@
 import pytest
 
+from lyth.compiler.identifier import IdentifierTable
 from lyth.compiler.symbol import Field
 from lyth.compiler.symbol import Name
 from lyth.compiler.symbol import SymbolType
@@ -82,6 +83,60 @@ def test_rich_comparison(clean_namespace):
     assert sym6 >= sym5
 
 
+def test_symbol_ids(clean_namespace):
+    """
+    To validate names and scopes are held as ids of a table of identifiers,
+    compared as integers within that table, and ordered alphabetically.
+    """
+    identifiers = IdentifierTable()
+    sym1 = Name('z', 'a', SymbolType(), identifiers)
+    sym2 = Name(identifiers.intern('z'), identifiers.intern('a'), SymbolType(), identifiers)
+    sym3 = Name('y', 'a', SymbolType(), identifiers)
+
+    assert sym1 == sym2
+    assert sym1.name_id == sym2.name_id == identifiers.intern('z')
+    assert sym1.scope_id == identifiers.intern('a')
+    assert sym2.name == 'z'
+    assert sym2.scope == 'a'
+    assert str(sym2) == "z, a"
+    assert sym1 > sym3
+
+    sym1 += sym3
+    assert sym1.left is sym3
+    assert sym1[('y', 'a')] is sym3
+    assert sym1[(sym3.name_id, sym3.scope_id)] is sym3
+    assert sym1['y'] == [sym3]
+
+    count = len(identifiers)
+    assert sym1['x'] == []
+    assert len(identifiers) == count and 'x' not in identifiers
+
+    # A name met in another source has ids of its own table.
+    other = Name('y', 'a', SymbolType())
+    assert other.name_id != sym3.name_id
+    assert other == sym3 and hash(other) == hash(sym3)
+    assert sym1[other] is sym3
+
+
+def test_symbol_random_names(clean_namespace):
+    """
+    To validate that names met in a random order keep the tree balanced
+    enough to be walked recursively.
+    """
+    import random
+
+    identifiers = IdentifierTable()
+    names = [f"name_{i}" for i in range(2000)]
+    random.Random(0).shuffle(names)
+    root = Name(names[0], 'test', SymbolType(), identifiers)
+
+    for name in names[1:]:
+        root += Name(name, 'test', SymbolType(), identifiers)
+
+    assert all(Name(name, 'test', SymbolType(), identifiers) in root for name in names)
+    assert [child.name for child in root(TraversalMode.IN_ORDER)] == sorted(names)
+
+
 def test_symbol_roots(clean_namespace):
     """
     To validate the analyzer can handle its root node as expected
@@ -2,8 +2,10 @@ import pytest
 
 from lyth.compiler.error import LythError
 from lyth.compiler.error import LythSyntaxError
+from lyth.compiler.token import KINDS
 from lyth.compiler.token import Keyword
 from lyth.compiler.token import Literal
+from lyth.compiler.token import Sentinel
 from lyth.compiler.token import Symbol
 from lyth.compiler.token import Token
 from lyth.compiler.token import TokenInfo
@@ -440,3 +442,78 @@ def test_keyword():
     assert token.info.lineno == 0
     assert token.symbol == Literal.STRING
     assert token.info.line == "alet"
+
+
+def test_lazy_line():
+    """
+    A token only keeps the position of its first character, the line is read
+    from the scanner when it is needed.
+    """
+    from lyth.compiler.scanner import Scanner
+
+    scan = Scanner("abc\n")
+    next(scan)
+    token = Token("a", scan)
+    assert token.info._line is None
+    assert token.info.index == 0
+
+    for _ in scan:
+        pass
+
+    assert token.info.line == "abc"
+    assert token.info._line == "abc"
+
+
+def test_compact_token():
+    """
+    Tokens and their information are slotted, and the lexemes of symbols and
+    keywords are shared by their tokens.
+    """
+    token = Token("l", TokenInfo("<stdin>", 0, 1, "let <- a"))
+    token += "et"
+    assert not hasattr(token, "__dict__")
+    assert not hasattr(token.info, "__dict__")
+    assert token.lexeme is Keyword.LET.value
+
+    token = Token("<", TokenInfo("<stdin>", 0, 5, "let <- a"))
+    token += "-"
+    assert token.lexeme is Symbol.LASSIGN.value
+
+
+def test_kind_codes():
+    """
+    Symbols, keywords and literals are given dense integer codes, and keep
+    their values. The kinds only the compiler creates come last, and are not
+    symbols.
+    """
+    assert [kind.code for kind in KINDS] == list(range(len(KINDS)))
+    assert len(KINDS) == len(Symbol) + len(Keyword) + len(Literal) + len(Sentinel)
+    assert KINDS[Keyword.LET.code] is Keyword.LET
+    assert KINDS[-1] is Sentinel.ERROR and Sentinel.ERROR.code == len(KINDS) - 1
+    assert Sentinel.ERROR not in list(Symbol) and Symbol.as_value('\x00') is None
+    assert Symbol.as_value('<-') is Symbol.LASSIGN
+    assert Keyword.LET.value == 'let'
+
+
+@pytest.mark.parametrize("first, lexeme, splits", [
+    ("-", "5", True),
+    ("+", "a", True),
+    ("(", "a", True),
+    ("a", ")", True),
+    ("5", ")", True),
+    ("f", "(", True),
+    ("5", "(", False),
+    ("<", "-", False),
+    ("-", "-", False),
+    ("a", "b", False),
+    ("*", "5", False),
+])
+def test_token_splits(first, lexeme, splits):
+    """
+    Token boundaries around operators are decided without raising exceptions.
+    """
+    token = Token(first, TokenInfo("<stdin>", 0, 0, ""))
+    assert token.splits(lexeme) is splits
+
+    token = Token(first, TokenInfo("<stdin>", 0, 0, ""), True)
+    assert token.splits(lexeme) is False
@@ -122,3 +122,20 @@ def test_lyth_ellipsis():
     with unittest.mock.patch.object(builtins, 'input', send_let):
         with unittest.mock.patch('sys.stdout', new_callable=StringIO):
             assert main(["test.py", "-c", "cycle=2"]) == 0
+
+
+def test_cache_option(tmp_path):
+    """
+    Start the main function with the token cache cleared, and then disabled.
+    """
+    from lyth.compiler.lexer import Lexer
+    (tmp_path / "stale.tok").write_bytes(b'stale')
+
+    with unittest.mock.patch.object(builtins, 'input', lambda x: '1 + 2'):
+        with unittest.mock.patch('sys.stdout', new_callable=StringIO):
+            assert main(["test.py", "-c", "cycle=1", "--cache", "clear", "--cache-dir", str(tmp_path)]) == 0
+            assert Lexer.cache is not None and Lexer.cache.directory == str(tmp_path)
+            assert not (tmp_path / "stale.tok").exists()
+
+            assert main(["test.py", "-c", "cycle=1", "--cache", "off"]) == 0
+            assert Lexer.cache is None